@@ -0,0 +1,10 @@
+"""Throughput and latency benchmarks for the FastAPI labs.
+
+Run from the repository root:
+
+    python -m benchmarks --apps lab3,lab5,lab9,lab10 --concurrency 50 --requests 2000 --output results.json
+
+Each app is imported in-process and driven over an ASGI transport (or a real
+uvicorn socket with --transport http). External services are replaced by
+local stand-ins: SQLite for lab5's PostgreSQL and a fake Ollama server for lab9.
+"""
@@ -0,0 +1,134 @@
+"""CLI: python -m benchmarks [--apps lab3,lab5] [--concurrency N] [--requests N | --duration S]"""
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+import psutil
+
+from benchmarks.apps import REPO_ROOT, SCENARIOS
+from benchmarks.loadgen import generate_load
+
+def rss_mb() -> float:
+    return round(psutil.Process().memory_info().rss / (1024 * 1024), 2)
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+@contextmanager
+def http_server(app):
+    """Run the app under uvicorn on a free local port in a background thread"""
+    import uvicorn
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.should_exit = True
+        thread.join()
+
+@contextmanager
+def make_client(app, transport: str, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if transport == 'http':
+        with http_server(app) as base_url:
+            yield httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30)
+    else:
+        yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench', timeout=30)
+
+async def run_scenario(scenario, app, args) -> dict:
+    with make_client(app, args.transport, args.concurrency) as client:
+        async with client:
+            if scenario.seed:
+                await scenario.seed(client)
+            rss_before = rss_mb()
+            result = await generate_load(client, scenario.make_request, concurrency=args.concurrency,
+                                         total_requests=None if args.duration else args.requests,
+                                         duration=args.duration)
+    result['memory_mb'] = {'rss_before': rss_before, 'rss_after': rss_mb()}
+    return result
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> list:
+    """Return human-readable regressions of RPS or p99 beyond `max_regression` (a fraction)"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        if old['rps'] and current['rps'] < old['rps'] * (1 - max_regression):
+            regressions.append(f"{name}: rps {old['rps']} -> {current['rps']}")
+        old_p99, new_p99 = old['latency_ms']['p99'], current['latency_ms']['p99']
+        if old_p99 and new_p99 and new_p99 > old_p99 * (1 + max_regression):
+            regressions.append(f'{name}: p99 {old_p99} ms -> {new_p99} ms')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the FastAPI labs in-process')
+    parser.add_argument('--apps', default=','.join(SCENARIOS), help='comma-separated: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per app')
+    parser.add_argument('--duration', type=float, help='seconds per app (overrides --requests)')
+    parser.add_argument('--transport', choices=('asgi', 'http'), default='asgi',
+                        help='asgi: call the app directly; http: real sockets through uvicorn')
+    parser.add_argument('--database-url', help='lab5 database (default: temporary SQLite file)')
+    parser.add_argument('--database-mode', choices=('sync', 'async'), default='sync',
+                        help='lab5 session mode (async uses aiosqlite/asyncpg)')
+    parser.add_argument('--ollama-latency', type=float, default=0.0, help='fake Ollama response delay (s)')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to check for regressions')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='allowed slowdown fraction')
+    args = parser.parse_args()
+
+    options = {'database_url': args.database_url, 'database_mode': args.database_mode,
+               'ollama_latency': args.ollama_latency}
+    results = {}
+    for name in args.apps.split(','):
+        scenario = SCENARIOS[name.strip()]
+        print(f'Benchmarking {scenario.name} ({scenario.lab})...')
+        with scenario.start(options) as app:
+            results[scenario.name] = asyncio.run(run_scenario(scenario, app, args))
+        summary = results[scenario.name]
+        print(f"  {summary['rps']} req/s, p50 {summary['latency_ms']['p50']} ms, "
+              f"p99 {summary['latency_ms']['p99']} ms, errors {summary['errors']}")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Results written to {args.output}')
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""In-process loading of the lab apps and the benchmark scenario for each."""
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from benchmarks.fake_ollama import fake_ollama_server
+from benchmarks.loadgen import RequestFactory
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@contextmanager
+def load_app(lab: str, module: str, env: Optional[Dict[str, str]] = None):
+    """Import <lab>/<module>.py with the lab directory on sys.path and `env` applied.
+
+    Lab modules (main, models, database, ...) are removed from sys.modules
+    afterwards so labs with clashing module names can run in one process.
+    """
+    lab_dir = os.path.join(REPO_ROOT, lab)
+    saved_env = {key: os.environ.get(key) for key in (env or {})}
+    os.environ.update(env or {})
+    sys.path.insert(0, lab_dir)
+    try:
+        yield importlib.import_module(module)
+    finally:
+        sys.path.remove(lab_dir)
+        for name, mod in list(sys.modules.items()):
+            if os.path.dirname(os.path.abspath(getattr(mod, '__file__', None) or os.sep)) == lab_dir:
+                del sys.modules[name]
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+class Scenario:
+    """How to start one app and what traffic to send it"""
+
+    def __init__(self, name: str, lab: str, module: str, make_request: RequestFactory,
+                 stand_in: Optional[Callable[[dict], object]] = None,
+                 setup: Optional[Callable[[object, dict], None]] = None,
+                 seed: Optional[Callable[[httpx.AsyncClient], Awaitable[None]]] = None):
+        self.name = name
+        self.lab = lab
+        self.module = module
+        self.make_request = make_request
+        self.stand_in = stand_in
+        self.setup = setup
+        self.seed = seed
+
+    @contextmanager
+    def start(self, options: dict):
+        """Start stand-ins, import the app and yield its ASGI object"""
+        with (self.stand_in(options) if self.stand_in else _no_stand_in()) as env:
+            with load_app(self.lab, self.module, env) as module:
+                if self.setup:
+                    self.setup(module, env)
+                yield module.app
+
+@contextmanager
+def _no_stand_in():
+    yield {}
+
+# -----------------------------------------------------------------------------
+# lab3: in-memory items
+# -----------------------------------------------------------------------------
+def lab3_request(i: int):
+    if i % 4 == 0:
+        return 'POST', '/items/', {'json': {'text': f'item {i}', 'is_done': i % 8 == 0}}
+    if i % 4 == 1:
+        return 'GET', '/items/', {'params': {'limit': 10}}
+    return 'GET', f'/items/{i % 50}', {}
+
+async def lab3_seed(client: httpx.AsyncClient):
+    for i in range(50):
+        await client.post('/items/', json={'text': f'seed {i}'})
+
+# -----------------------------------------------------------------------------
+# lab5: quiz API on a throwaway SQLite file instead of PostgreSQL
+# -----------------------------------------------------------------------------
+LAB5_DIR = os.path.join(REPO_ROOT, 'lab5-fastapi-postgresql')
+
+def migrate_lab5(url: str):
+    """`alembic upgrade head` in a subprocess, so lab5 modules stay out of this process"""
+    subprocess.run([sys.executable, '-m', 'alembic', '-c', os.path.join(LAB5_DIR, 'alembic.ini'), 'upgrade', 'head'],
+                   cwd=LAB5_DIR, env={**os.environ, 'DATABASE_URL': url}, check=True, capture_output=True)
+
+@contextmanager
+def lab5_database(options: dict):
+    mode = {'DATABASE_MODE': options.get('database_mode') or 'sync'}
+    url = options.get('database_url')
+    if url:
+        migrate_lab5(url)
+        yield {'DATABASE_URL': url, **mode}
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'quiz.db')}"
+        migrate_lab5(url)
+        yield {'DATABASE_URL': url, **mode}
+
+LAB5_QUESTIONS = 100
+
+def lab5_request(i: int):
+    question_id = i % LAB5_QUESTIONS + 1
+    if i % 10 == 0:
+        return 'POST', '/questions/', {'json': {
+            'question_text': f'Question {i}?',
+            'choices': [{'choice_text': f'Choice {c}', 'is_correct': c == 0} for c in range(4)],
+        }}
+    if i % 10 == 5:
+        return 'GET', '/questions/', {'params': {'ids': [(question_id + k) % LAB5_QUESTIONS + 1 for k in range(10)]}}
+    if i % 2:
+        return 'GET', f'/questions/{question_id}', {}
+    return 'GET', f'/choices/{question_id}', {}
+
+async def lab5_seed(client: httpx.AsyncClient):
+    for i in range(LAB5_QUESTIONS):
+        await client.post('/questions/', json={
+            'question_text': f'Seed question {i}?',
+            'choices': [{'choice_text': f'Choice {c}', 'is_correct': c == 0} for c in range(4)],
+        })
+
+# -----------------------------------------------------------------------------
+# lab9: LLM gateway against a fake Ollama server
+# -----------------------------------------------------------------------------
+LAB9_API_KEY = 'benchmark-key'
+
+@contextmanager
+def lab9_ollama(options: dict):
+    with fake_ollama_server(latency=options.get('ollama_latency', 0.0)) as url:
+        yield {'OLLAMA_HOST': url, 'API_KEY': LAB9_API_KEY}
+
+def lab9_setup(module, env: dict):
+    import ollama
+    # ollama.chat is bound to a client created when ollama was first imported,
+    # so point the app at a client for the fake server explicitly
+    module.ollama = ollama.Client(host=env['OLLAMA_HOST'])
+    module.API_KEY_CREDITS[LAB9_API_KEY] = 10 ** 12
+
+def lab9_request(i: int):
+    return 'POST', '/generate', {'params': {'prompt': f'Hello {i}'}, 'headers': {'x-api-key': LAB9_API_KEY}}
+
+# -----------------------------------------------------------------------------
+# lab10: music recommender
+# -----------------------------------------------------------------------------
+def lab10_request(i: int):
+    if i % 20 == 0:
+        return 'POST', '/predict/batch', {'json': {
+            'age': [18 + j % 30 for j in range(500)], 'gender': [j % 2 for j in range(500)]}}
+    return 'POST', '/predict', {'json': {'age': 18 + i % 30, 'gender': i % 2}}
+
+async def lab10_seed(client: httpx.AsyncClient):
+    # First request loads the model lazily; keep it out of the measurement
+    await client.post('/predict', json={'age': 21, 'gender': 1})
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        Scenario('lab3', 'lab3-fastapi', 'main', lab3_request, seed=lab3_seed),
+        Scenario('lab5', 'lab5-fastapi-postgresql', 'main', lab5_request, stand_in=lab5_database, seed=lab5_seed),
+        Scenario('lab9', 'lab9-llm-fastapi-ollama', 'main', lab9_request, stand_in=lab9_ollama, setup=lab9_setup),
+        Scenario('lab10', 'lab10-machine-learning', 'app', lab10_request, seed=lab10_seed),
+    )
+}
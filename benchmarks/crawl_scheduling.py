@@ -0,0 +1,87 @@
+"""Lab 8 crawl scheduling: fixed asyncio.gather batches vs the sliding-window scheduler.
+
+    python -m benchmarks.crawl_scheduling
+    python -m benchmarks.crawl_scheduling --pages 500 --concurrency 20 --slow-share 0.05
+
+Pages come from lab2's local stub server (/delay/<seconds>): most answer in
+--fast seconds, a --slow-share of them take --slow seconds, and a --flaky-share
+answer 503 once before succeeding. Every run crawls the same page plan and
+uses the same httpx client. batched_gather and sliding_window make one attempt
+per page, so they differ only in how slots are scheduled; the
+sliding_window_retries row adds the scheduler's retries on top.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.apps import load_app
+
+def make_plan(pages: int, fast: float, slow: float, slow_share: float, flaky_share: float, seed: int):
+    """Per page: a delay in seconds, or None for a page that fails once"""
+    rng = random.Random(seed)
+    plan = []
+    for _ in range(pages):
+        if rng.random() < flaky_share:
+            plan.append(None)
+        else:
+            plan.append(slow if rng.random() < slow_share else fast * rng.uniform(0.5, 1.5))
+    return plan
+
+def make_urls(base: str, plan, run: str):
+    # The stub server counts failures per key, so each run needs its own flaky keys
+    return [f'{base}/flaky/{run}-{i}?failures=1' if delay is None else f'{base}/delay/{delay:.3f}?page={i}'
+            for i, delay in enumerate(plan)]
+
+def http_error(response) -> str:
+    return f'HTTP {response.status_code}' if response.status_code >= 400 else None
+
+async def measure(outcomes) -> dict:
+    start = time.perf_counter()
+    ok = failed = 0
+    async for outcome in outcomes:
+        ok += outcome.ok
+        failed += not outcome.ok
+    seconds = time.perf_counter() - start
+    return {'seconds': round(seconds, 3), 'pages_per_second': round((ok + failed) / seconds, 1),
+            'ok': ok, 'failed': failed}
+
+async def run(args, scheduler_module, base: str) -> dict:
+    plan = make_plan(args.pages, args.fast, args.slow, args.slow_share, args.flaky_share, args.seed)
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        for name in ('batched_gather', 'sliding_window', 'sliding_window_retries'):
+            urls = make_urls(base, plan, name)
+            if name == 'batched_gather':
+                outcomes = scheduler_module.crawl_batched(client.get, urls, args.concurrency, error_of=http_error)
+            else:
+                retries = 2 if name == 'sliding_window_retries' else 0
+                scheduler = scheduler_module.CrawlScheduler(client.get, args.concurrency, retries=retries,
+                                                            backoff_base=0.05, error_of=http_error)
+                outcomes = scheduler.run(urls)
+            results[name] = await measure(outcomes)
+    results['speedup'] = round(results['batched_gather']['seconds'] / results['sliding_window']['seconds'], 2)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare batched gather with the sliding-window crawl scheduler')
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--fast', type=float, default=0.05, help='typical page time (seconds)')
+    parser.add_argument('--slow', type=float, default=1.0, help='slow page time (seconds)')
+    parser.add_argument('--slow-share', type=float, default=0.1)
+    parser.add_argument('--flaky-share', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=1, help='seed of the page plan shared by every run')
+    args = parser.parse_args()
+
+    with load_app('lab2-requests', 'stub_server') as stub, stub.stub_server() as server:
+        with load_app('lab8-crawl4AI', 'scheduler') as scheduler_module:
+            results = asyncio.run(run(args, scheduler_module, server.url))
+    print(json.dumps({'pages': args.pages, 'concurrency': args.concurrency, 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Minimal stand-in for the Ollama HTTP API (/api/chat and /api/generate)."""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    reply = 'This is a canned benchmark response.'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        time.sleep(self.latency)
+        payload = {
+            'model': body.get('model', 'fake'),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'done': True,
+        }
+        if self.path == '/api/chat':
+            payload['message'] = {'role': 'assistant', 'content': self.reply}
+        elif self.path == '/api/generate':
+            payload['response'] = self.reply
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def fake_ollama_server(latency: float = 0.0):
+    """Serve the fake API on a free local port; yields its base URL"""
+    handler = type('Handler', (FakeOllamaHandler,), {'latency': latency})
+    server = FakeOllamaServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,55 @@
+"""Lab 6 comment extraction: the original BeautifulSoup walk vs each parser backend.
+
+    python -m benchmarks.hn_parsing
+    python -m benchmarks.hn_parsing --html saved_thread.html --repeat 5
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+
+from benchmarks.apps import REPO_ROOT, load_app
+
+DEFAULT_FIXTURE = os.path.join(REPO_ROOT, 'lab6-web-scraping', 'fixtures', 'item_42919502.html.gz')
+
+def original_extraction(html: bytes):
+    """What scraper.py did before: html.parser, find_all + find_next, get_text() three times"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    soup.find_all(class_='comment')
+    elements = soup.find_all(class_='ind', indent=0)
+    comments = [e.find_next(class_='comment') for e in elements]
+    for _ in range(3):
+        texts = [comment.get_text() for comment in comments]
+    return texts
+
+def best_of(fn, html: bytes, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HN comment extraction backends')
+    parser.add_argument('--html', default=DEFAULT_FIXTURE, help='saved item page (.html or .html.gz)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    opener = gzip.open if args.html.endswith('.gz') else open
+    with opener(args.html, 'rb') as f:
+        html = f.read()
+
+    with load_app('lab6-web-scraping', 'parsers') as parsers:
+        baseline, count = best_of(original_extraction, html, args.repeat)
+        results = {'original_bs4': {'seconds': round(baseline, 4), 'comments': count, 'speedup': 1.0}}
+        for name in parsers.available_backends():
+            seconds, count = best_of(parsers.BACKENDS[name], html, args.repeat)
+            results[name] = {'seconds': round(seconds, 4), 'comments': count, 'speedup': round(baseline / seconds, 1)}
+
+    print(json.dumps({'html_bytes': len(html), 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
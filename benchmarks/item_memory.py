@@ -0,0 +1,76 @@
+"""Bytes per stored item in lab3: a list of pydantic Items vs the compact ItemStore.
+
+    python -m benchmarks.item_memory --items 1000000
+
+Also times the first page of a store whose items were all deleted but the
+last 10, which should not depend on how many were deleted.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.apps import load_app
+
+def make_texts(n: int, distinct: int):
+    # Fresh str objects each time, as if parsed from separate request bodies
+    for i in range(n):
+        yield f'Task number {i % distinct}'
+
+def measure(fill) -> int:
+    """Bytes still allocated after fill() returns the structure it built"""
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    kept = fill()
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return end - start
+
+def page_after_deletes_ms(store_class, items: int, repeat: int = 100) -> float:
+    store = store_class()
+    ids = [store.add(f'item {i}', i % 2 == 0) for i in range(items)]
+    for item_id in ids[:-10]:
+        store.delete(item_id)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        store.list(limit=5)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--distinct-texts', type=int, default=1_000,
+                        help='number of different texts (repeats exercise interning)')
+    args = parser.parse_args()
+
+    with load_app('lab3-fastapi', 'main') as lab3:
+        def fill_models():
+            return [lab3.Item(text=text, is_done=i % 2 == 0)
+                    for i, text in enumerate(make_texts(args.items, args.distinct_texts))]
+
+        def fill_store():
+            store = lab3.ItemStore()
+            for i, text in enumerate(make_texts(args.items, args.distinct_texts)):
+                store.add(text, i % 2 == 0)
+            return store
+
+        models_bytes = measure(fill_models)
+        store_bytes = measure(fill_store)
+        page_ms = page_after_deletes_ms(lab3.ItemStore, args.items)
+
+    result = {
+        'items': args.items,
+        'distinct_texts': args.distinct_texts,
+        'pydantic_list_bytes_per_item': round(models_bytes / args.items, 1),
+        'item_store_bytes_per_item': round(store_bytes / args.items, 1),
+        'reduction': round(models_bytes / store_bytes, 2) if store_bytes else None,
+        'first_page_after_deletes_ms': round(page_ms, 4),
+    }
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
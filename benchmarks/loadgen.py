@@ -0,0 +1,62 @@
+"""Concurrent async load generator and latency statistics."""
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+
+# make_request(i) -> (method, path, httpx request kwargs)
+RequestFactory = Callable[[int], Tuple[str, str, dict]]
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: List[float], elapsed: float, status_counts: Counter) -> dict:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    errors = sum(count for status, count in status_counts.items() if status == 'error' or int(status) >= 400)
+    return {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 4),
+        'rps': round(len(latencies_ms) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else None,
+            **{f'p{q}': round(percentile(latencies_ms, q), 3) if latencies_ms else None for q in (50, 95, 99)},
+            'max': round(latencies_ms[-1], 3) if latencies_ms else None,
+        },
+        'status_codes': {str(status): count for status, count in sorted(status_counts.items(), key=str)},
+    }
+
+async def generate_load(client: httpx.AsyncClient, make_request: RequestFactory, concurrency: int = 10,
+                        total_requests: Optional[int] = 1000, duration: Optional[float] = None) -> dict:
+    """Keep `concurrency` requests in flight until `total_requests` are sent or `duration` seconds pass"""
+    latencies: List[float] = []
+    status_counts = Counter()
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if total_requests is not None and i >= total_requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            method, path, kwargs = make_request(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status_counts[response.status_code] += 1
+            except httpx.HTTPError:
+                status_counts['error'] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, status_counts)
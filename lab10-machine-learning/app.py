@@ -1,17 +1,202 @@
-from fastapi import FastAPI
+import json
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import joblib
+from starlette.concurrency import run_in_threadpool
+import numpy as np
+
+from batcher import MicroBatcher
+from lookup_table import AGE_RANGE, DEFAULT_TABLE_PATH, GENDER_RANGE, LookupTable
+from model_registry import ModelRegistry
+from prediction_cache import BACKENDS, PredictionCache
+
+def env_flag(name: str) -> bool:
+    return os.getenv(name, '0').lower() in ('1', 'true', 'yes')
+
+# Models load lazily on first use (or at startup with MODEL_WARMUP=1) and are
+# reloaded when their file is replaced, checked every MODEL_RELOAD_INTERVAL seconds
+RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '5'))
+model_registry = ModelRegistry(os.getenv('MODEL_PATH', 'music_recommender.joblib'), check_interval=RELOAD_INTERVAL)
+
+# MODEL_BACKEND=table serves from the compiled lookup table (see lookup_table.py)
+# and only imports joblib/sklearn if a request falls outside the compiled domain
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'sklearn')
+table_registry = None
+if MODEL_BACKEND == 'table':
+    table_registry = ModelRegistry(os.getenv('MODEL_TABLE_PATH', DEFAULT_TABLE_PATH),
+                                   loader=LookupTable.load, check_interval=RELOAD_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if env_flag('MODEL_WARMUP'):
+        await run_in_threadpool((table_registry or model_registry).warm_up)
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+MAX_BATCH_ROWS = 100_000
+STREAM_CHUNK_ROWS = 1_000
+
+@lru_cache(maxsize=None)
+def genre_line(genre: str) -> str:
+    """Pre-encoded NDJSON line per genre, so streaming never calls json.dumps per row"""
+    return json.dumps({'genre': str(genre)}) + '\n'
+
+def outside_table_domain() -> HTTPException:
+    return HTTPException(status_code=422, detail='Input is outside the compiled model domain')
+
+def predict_versioned(features: np.ndarray) -> Tuple[np.ndarray, Optional[str]]:
+    """Score an (n, 2) feature matrix with whichever backend is configured, plus the
+    version of the joblib model that scored it (None if the table answered every row)"""
+    if table_registry is None:
+        model, version = model_registry.get_versioned()
+        return model.predict(features), version
+    genres, in_domain = table_registry.get().predict(features)
+    if in_domain.all():
+        return genres, None
+    try:
+        model, version = model_registry.get_versioned()
+    except (ImportError, FileNotFoundError):
+        # Slim table image: no joblib/sklearn, or no model file to fall back to
+        raise outside_table_domain()
+    genres[~in_domain] = model.predict(features[~in_domain])
+    return genres, version
+
+def predict_rows(features: np.ndarray) -> np.ndarray:
+    return predict_versioned(features)[0]
 
-app = FastAPI()
-model = joblib.load('music_recommender.joblib')
+def predict_pairs(features: np.ndarray) -> List[Tuple[Any, Optional[str]]]:
+    """(genre, model version) per row, so batched answers are cached under the model that gave them"""
+    genres, version = predict_versioned(features)
+    return [(genre, version) for genre in genres]
+
+# Opt-in dynamic batching for /predict, e.g. BATCHING_ENABLED=1 BATCH_MAX_DELAY_MS=2 BATCH_MAX_SIZE=64
+batcher = None
+if env_flag('BATCHING_ENABLED'):
+    batcher = MicroBatcher(
+        predict_pairs,
+        max_delay_ms=float(os.getenv('BATCH_MAX_DELAY_MS', '2')),
+        max_batch_size=int(os.getenv('BATCH_MAX_SIZE', '64')),
+    )
+
+# Prediction cache: PREDICTION_CACHE=lru (default), sqlite (shared by all workers) or off
+prediction_cache = None
+CACHE_BACKEND = os.getenv('PREDICTION_CACHE', 'lru')
+if CACHE_BACKEND == 'lru':
+    prediction_cache = PredictionCache(BACKENDS['lru'](
+        maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', '4096')),
+        ttl=float(os.getenv('PREDICTION_CACHE_TTL', '300')),
+    ), age_range=AGE_RANGE, gender_range=GENDER_RANGE)
+elif CACHE_BACKEND == 'sqlite':
+    prediction_cache = PredictionCache(BACKENDS['sqlite'](
+        path=os.getenv('PREDICTION_CACHE_PATH'),
+        ttl=float(os.getenv('PREDICTION_CACHE_TTL', '300')),
+        maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', '4096')),
+    ), age_range=AGE_RANGE, gender_range=GENDER_RANGE)
+
+async def cache_call(method: Callable, *args):
+    """Call a prediction cache method, off the event loop if its backend does file I/O"""
+    if prediction_cache.backend.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+async def serving_version() -> str:
+    """Version of the model behind cached answers, loading or hot-swapping it off the event loop if needed.
+
+    Always the joblib model: in table mode only inputs outside a table compiled
+    for a smaller domain reach the cache, and those come from the joblib fallback.
+    """
+    if model_registry.needs_check():
+        try:
+            await run_in_threadpool(model_registry.get)
+        except (ImportError, FileNotFoundError):
+            if table_registry is None:
+                raise
+            raise outside_table_domain()
+    return model_registry.version
 
 class UserInput(BaseModel):
     age: int
     gender: int
 
+class BatchRows(BaseModel):
+    """Row format: {"rows": [[age, gender], ...]}"""
+    rows: List[Tuple[int, int]]
+
+class BatchColumns(BaseModel):
+    """Columnar format: {"age": [...], "gender": [...]}"""
+    age: List[int]
+    gender: List[int]
+
+def to_features(batch: Union[BatchColumns, BatchRows]) -> np.ndarray:
+    """Build a single (n, 2) feature matrix from either batch format"""
+    if isinstance(batch, BatchColumns):
+        if len(batch.age) != len(batch.gender):
+            raise HTTPException(status_code=422, detail='age and gender must have the same length')
+        features = np.column_stack((batch.age, batch.gender)) if batch.age else np.empty((0, 2))
+    else:
+        features = np.asarray(batch.rows, dtype=np.int64).reshape(-1, 2)
+    if len(features) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f'Batch is limited to {MAX_BATCH_ROWS} rows')
+    return features
+
+def stream_genres(genres: np.ndarray) -> Iterator[str]:
+    """Yield predictions as NDJSON, one chunk of lines at a time"""
+    for start in range(0, len(genres), STREAM_CHUNK_ROWS):
+        yield ''.join(genre_line(genre) for genre in genres[start:start + STREAM_CHUNK_ROWS])
+
 @app.post('/predict')
-def predict(user_input: UserInput):
-    prediction = model.predict([[user_input.age, user_input.gender]])
-    return {'genre': prediction[0]}
+async def predict(user_input: UserInput):
+    age, gender = user_input.age, user_input.gender
+    if table_registry is not None:
+        genre = table_registry.get().predict_one(age, gender)
+        if genre is not None:
+            return {'genre': genre}
+    cached = prediction_cache is not None and prediction_cache.covers(age, gender)
+    if cached:
+        genre = await cache_call(prediction_cache.get, await serving_version(), age, gender)
+        if genre is not None:
+            return {'genre': genre}
+    if batcher is not None:
+        genre, version = await batcher.predict(age, gender)
+    else:
+        genres, version = await run_in_threadpool(predict_versioned, np.array([[age, gender]]))
+        genre = genres[0]
+    # Stored under the version of the model that answered, even if it was swapped since the lookup
+    if cached and version is not None:
+        await cache_call(prediction_cache.set, version, age, gender, genre)
+    return {'genre': genre}
+
+@app.post('/predict/batch')
+def predict_batch(batch: Union[BatchColumns, BatchRows]):
+    """Score many users with one vectorized predict call, streamed back as NDJSON"""
+    features = to_features(batch)
+    genres = predict_rows(features) if len(features) else np.empty(0, dtype=object)
+    return StreamingResponse(stream_genres(genres), media_type='application/x-ndjson')
+
+@app.get('/metrics/batching')
+def batching_metrics():
+    """Latency and batch-size stats of the micro-batcher, if enabled"""
+    if batcher is None:
+        return {'enabled': False}
+    return {'enabled': True, **batcher.stats()}
 
+@app.get('/metrics/cache')
+def cache_metrics():
+    """Hit/miss counters of the prediction cache in this worker"""
+    if prediction_cache is None:
+        return {'enabled': False}
+    return {'enabled': True, **prediction_cache.stats()}
 
+@app.get('/models')
+def model_info():
+    """Load state, file version and load time of each model"""
+    info = {'backend': MODEL_BACKEND, 'model': model_registry.info()}
+    if table_registry is not None:
+        info['table'] = table_registry.info()
+    return info
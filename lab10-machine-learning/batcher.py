@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Callable, List, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions into one vectorized call.
+
+    Requests are held until either `max_delay_ms` has passed since the first
+    one arrived or `max_batch_size` rows are waiting, whichever comes first.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_delay_ms: float = 2.0, max_batch_size: int = 64,
+                 max_latency_samples: int = 10_000):
+        self.predict_fn = predict_fn
+        self.max_delay = max_delay_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.latencies = deque(maxlen=max_latency_samples)
+        self.batch_sizes = Counter()
+        self._pending: List[Tuple[Tuple[int, int], asyncio.Future]] = []
+        self._timer = None
+        self._tasks = set()
+
+    async def predict(self, age: int, gender: int):
+        """Queue one row and wait for its share of the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        start = time.perf_counter()
+        self._pending.append(((age, gender), future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        result = await future
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batch_sizes[len(batch)] += 1
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        features = np.array([row for row, _ in batch])
+        try:
+            genres = await run_in_threadpool(self.predict_fn, features)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), genre in zip(batch, genres):
+            if not future.done():
+                future.set_result(genre)
+
+    def stats(self) -> dict:
+        """Latency percentiles and batch-size histogram for tuning the window"""
+        latencies_ms = np.array(self.latencies) * 1000
+        percentiles = (np.percentile(latencies_ms, [50, 90, 99]).round(3).tolist()
+                       if len(latencies_ms) else [None, None, None])
+        return {
+            'max_delay_ms': self.max_delay * 1000,
+            'max_batch_size': self.max_batch_size,
+            'requests': sum(size * count for size, count in self.batch_sizes.items()),
+            'batches': sum(self.batch_sizes.values()),
+            'latency_ms': dict(zip(('p50', 'p90', 'p99'), percentiles)),
+            'batch_size_histogram': {size: self.batch_sizes[size] for size in sorted(self.batch_sizes)},
+        }
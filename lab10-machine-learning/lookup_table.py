@@ -0,0 +1,87 @@
+"""Compile the music recommender into a dense (age, gender) lookup table.
+
+The trained DecisionTree only sees two small integer features, so every
+answer over the valid domain can be precomputed once and served with plain
+NumPy indexing - no sklearn import and no tree walk per request.
+
+Export:  python lookup_table.py [--model music_recommender.joblib] [--out music_recommender_table.npz]
+"""
+import argparse
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_TABLE_PATH = 'music_recommender_table.npz'
+# Inputs the service treats as valid: the table compiles them, the prediction cache stores them
+AGE_RANGE = (0, 120)
+GENDER_RANGE = (0, 1)
+
+def compile_table(model, age_range: Tuple[int, int] = AGE_RANGE, gender_range: Tuple[int, int] = GENDER_RANGE) -> dict:
+    """Score every (age, gender) pair in the inclusive ranges with one predict call"""
+    ages = np.arange(age_range[0], age_range[1] + 1)
+    genders = np.arange(gender_range[0], gender_range[1] + 1)
+    grid = np.array(np.meshgrid(ages, genders, indexing='ij')).reshape(2, -1).T
+    genres = model.predict(grid)
+    classes = np.asarray(model.classes_, dtype=str)
+    codes = np.searchsorted(classes, np.asarray(genres, dtype=str)).astype(np.uint8)
+    return {
+        'table': codes.reshape(len(ages), len(genders)),
+        'classes': classes,
+        'age_min': np.int64(age_range[0]),
+        'gender_min': np.int64(gender_range[0]),
+    }
+
+class LookupTable:
+    """Serve predictions from a compiled table; needs NumPy only"""
+
+    def __init__(self, table: np.ndarray, classes: np.ndarray, age_min: int, gender_min: int):
+        self.table = table
+        self.classes = classes
+        self.age_min = int(age_min)
+        self.gender_min = int(gender_min)
+        # Nested tuples of str make the single-row path a pair of list indexes
+        self._rows = tuple(tuple(str(classes[code]) for code in row) for row in table)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABLE_PATH) -> 'LookupTable':
+        with np.load(path) as data:
+            return cls(data['table'], data['classes'], data['age_min'], data['gender_min'])
+
+    def predict_one(self, age: int, gender: int):
+        """Genre for one row, or None when the row is outside the compiled domain"""
+        age_idx, gender_idx = age - self.age_min, gender - self.gender_min
+        if 0 <= age_idx < len(self._rows) and 0 <= gender_idx < len(self._rows[0]):
+            return self._rows[age_idx][gender_idx]
+        return None
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized lookup; returns (genres, in_domain) where out-of-domain rows need a fallback"""
+        age_idx = features[:, 0] - self.age_min
+        gender_idx = features[:, 1] - self.gender_min
+        in_domain = ((age_idx >= 0) & (age_idx < self.table.shape[0])
+                     & (gender_idx >= 0) & (gender_idx < self.table.shape[1]))
+        codes = np.zeros(len(features), dtype=self.table.dtype)
+        codes[in_domain] = self.table[age_idx[in_domain], gender_idx[in_domain]]
+        return self.classes[codes], in_domain
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the recommender into a lookup table')
+    parser.add_argument('--model', default='music_recommender.joblib')
+    parser.add_argument('--out', default=DEFAULT_TABLE_PATH)
+    parser.add_argument('--max-age', type=int, default=AGE_RANGE[1])
+    args = parser.parse_args()
+
+    import joblib
+    model = joblib.load(args.model)
+    compiled = compile_table(model, age_range=(0, args.max_age))
+    np.savez(args.out, **compiled)
+
+    # Sanity check: the table must agree with the model everywhere in the domain
+    table = LookupTable.load(args.out)
+    ages, genders = np.meshgrid(np.arange(args.max_age + 1), np.arange(2), indexing='ij')
+    grid = np.column_stack((ages.ravel(), genders.ravel()))
+    assert (table.predict(grid)[0] == model.predict(grid)).all(), 'table disagrees with model'
+    print(f"Compiled {compiled['table'].size} predictions into {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Lazy, hot-swappable model loading.
+
+Models are loaded on first use (or from a warm-up hook), timed, and reloaded
+when their file changes on disk. Publish a new model by writing it next to
+the old one and renaming it into place (`os.replace`), so workers never see a
+half-written file; each worker swaps to the new object on its next check.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+__location__ = os.path.dirname(os.path.abspath(__file__))
+
+def load_joblib(path: str) -> Any:
+    """Load with mmap_mode='r' so NumPy arrays in the pickle are mapped from the
+    page cache and shared read-only between forked workers"""
+    import joblib
+    return joblib.load(path, mmap_mode='r')
+
+class ModelRegistry:
+    """Holds one model file and swaps in a new version without a restart"""
+
+    def __init__(self, path: str, loader: Callable[[str], Any] = load_joblib, check_interval: float = 5.0):
+        self.path = path if os.path.isabs(path) else os.path.join(__location__, path)
+        self.loader = loader
+        self.check_interval = check_interval
+        self.version: Optional[str] = None
+        self.load_time_ms: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self._model = None
+        # (model, version) published together, for callers that record which model answered
+        self._current: Optional[Tuple[Any, str]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_version(self) -> str:
+        stat = os.stat(self.path)
+        return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+    def needs_check(self) -> bool:
+        """True when the next get() would load the model or stat its file"""
+        return self._model is None or (
+            self.check_interval >= 0 and time.monotonic() - self._last_check >= self.check_interval)
+
+    def get(self) -> Any:
+        """Return the current model, loading it or picking up a new file if needed"""
+        if self._model is None:
+            return self.reload()
+        if self.needs_check():
+            self._last_check = time.monotonic()
+            try:
+                if self._file_version() != self.version:
+                    return self.reload()
+            except OSError:
+                pass  # file is mid-replace or gone; keep serving the loaded model
+        return self._model
+
+    def get_versioned(self) -> Tuple[Any, str]:
+        """Like get(), plus the version of that same model (the pair is swapped as one)"""
+        self.get()
+        return self._current
+
+    def reload(self) -> Any:
+        """Load the file into a new object, then publish it with a single assignment"""
+        with self._lock:
+            version = self._file_version()
+            if self._model is not None and version == self.version:
+                return self._model
+            start = time.perf_counter()
+            model = self.loader(self.path)
+            self.load_time_ms = round((time.perf_counter() - start) * 1000, 3)
+            self.loaded_at = time.time()
+            self.version = version
+            self._last_check = time.monotonic()
+            self._model = model
+            self._current = (model, version)
+            print(f'Loaded {os.path.basename(self.path)} (version {version}) in {self.load_time_ms} ms')
+            return model
+
+    def warm_up(self) -> Any:
+        """Load eagerly, e.g. from a startup hook, so the first request does not pay for it"""
+        return self.get()
+
+    def info(self) -> dict:
+        return {
+            'path': self.path,
+            'loaded': self._model is not None,
+            'version': self.version,
+            'load_time_ms': self.load_time_ms,
+            'loaded_at': self.loaded_at,
+        }
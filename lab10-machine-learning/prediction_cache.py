@@ -0,0 +1,183 @@
+"""Prediction cache keyed on (model version, age, gender).
+
+Two backends share the same get/set/clear interface:
+- LRUBackend: in-process OrderedDict with TTL (default)
+- SQLiteBackend: file-backed store shared by every worker on the host
+
+Keys carry the model version, so a new model file never serves old answers;
+the cache is also cleared as soon as a new version is seen. Only inputs inside
+`age_range` x `gender_range` are cached, so clients cannot grow the store with
+arbitrary ages, and SQLite errors (a locked file) count as a miss or a skipped
+write instead of failing the request.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+class LRUBackend:
+    """Thread-safe in-process LRU with per-entry expiry"""
+
+    # In memory: cheap enough to call on the event loop, and nothing to fail
+    blocking = False
+    errors = ()
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class SQLiteBackend:
+    """File-backed cache shared across worker processes.
+
+    Every `prune_every` writes, expired rows are deleted and the oldest ones
+    beyond `maxsize` are evicted, so the file stays bounded (give or take
+    `prune_every` rows per worker).
+    """
+
+    blocking = True
+    errors = (sqlite3.Error,)
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 300.0, maxsize: int = 4096, prune_every: int = 64):
+        self.path = path or os.path.join(tempfile.gettempdir(), 'music_recommender_cache.sqlite')
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS predictions '
+                         '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS predictions_expires ON predictions (expires)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers in other workers proceed during writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            'SELECT value FROM predictions WHERE key = ? AND expires >= ?', (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)', (key, value, now + self.ttl))
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune(now)
+
+    def prune(self, now: Optional[float] = None):
+        """Delete expired rows, then the ones expiring first until at most `maxsize` remain"""
+        conn = self._connect()
+        conn.execute('DELETE FROM predictions WHERE expires < ?', (now or time.time(),))
+        conn.execute('DELETE FROM predictions WHERE key IN (SELECT key FROM predictions ORDER BY expires '
+                     'LIMIT max(0, (SELECT COUNT(*) FROM predictions) - ?))', (self.maxsize,))
+
+    def count(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+
+    def clear(self):
+        self._connect().execute('DELETE FROM predictions')
+
+BACKENDS = {'lru': LRUBackend, 'sqlite': SQLiteBackend}
+
+class PredictionCache:
+    """Version-aware front end over a backend, with hit/miss counters"""
+
+    def __init__(self, backend, age_range: Tuple[int, int] = (0, 120), gender_range: Tuple[int, int] = (0, 1)):
+        self.backend = backend
+        self.age_range = age_range
+        self.gender_range = gender_range
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def covers(self, age: int, gender: int) -> bool:
+        """Only inputs in the model's domain are cached"""
+        return (self.age_range[0] <= age <= self.age_range[1]
+                and self.gender_range[0] <= gender <= self.gender_range[1])
+
+    def _check_version(self, version: str):
+        with self._lock:
+            if version == self.version:
+                return
+            previous, self.version = self.version, version
+            if previous is not None:
+                self.invalidations += 1
+        if previous is not None:
+            # Keys carry the version, so a failed clear cannot serve old answers
+            try:
+                self.backend.clear()
+            except self.backend.errors:
+                self.errors += 1
+
+    def get(self, version: str, age: int, gender: int) -> Optional[str]:
+        """Cached genre, or None on a miss (including a backend error)"""
+        value = None
+        try:
+            self._check_version(version)
+            value = self.backend.get(f'{version}:{age}:{gender}')
+        except self.backend.errors:
+            self.errors += 1
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, version: str, age: int, gender: int, genre: str):
+        """Store a genre; skipped if the backend fails"""
+        try:
+            self._check_version(version)
+            self.backend.set(f'{version}:{age}:{gender}', str(genre))
+        except self.backend.errors:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'model_version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'invalidations': self.invalidations,
+            'errors': self.errors,
+        }
@@ -184,3 +184,100 @@ try:
         print(f"urllib - Response: {result['form']}")
 except Exception as e:
     print(f"urllib error: {e}")
+
+# =============================================================================
+# 10. REUSABLE CLIENTS FOR BULK CALLS
+# =============================================================================
+print("\n" + "="*50)
+print("10. REUSABLE CLIENTS FOR BULK CALLS")
+print("="*50)
+
+# Every requests.get() above opens a new connection. For many calls, reuse one
+# pooled client with timeouts, retries and a concurrency limit (http_client.py).
+# A local stub server stands in for httpbin so this section runs offline.
+import asyncio
+import time
+from http_client import AsyncHTTPClient, HTTPClient
+from stub_server import stub_server
+
+with stub_server() as server:
+    print("\n--- Pooled Session with Retries ---")
+    with HTTPClient(max_concurrency=10) as client:
+        response = client.get(f"{server.url}/flaky/demo?failures=2")
+        print(f"Flaky endpoint -> Status: {response.status_code} after {server.hits['/flaky/demo']} attempts")
+
+        print("\n--- fetch_many (threads, results as they complete) ---")
+        urls = [f"{server.url}/delay/0.2" for _ in range(20)]
+        start = time.perf_counter()
+        results = list(client.fetch_many(urls))
+        print(f"{sum(r.ok for r in results)}/{len(urls)} OK in {time.perf_counter() - start:.2f}s "
+              f"(one by one: ~{0.2 * len(urls):.1f}s)")
+
+    print("\n--- Async Client (httpx, HTTP/2 when available) ---")
+
+    async def fetch_all():
+        async with AsyncHTTPClient(max_concurrency=20, rate_limit=100) as client:
+            start = time.perf_counter()
+            ok = 0
+            async for result in client.fetch_many(f"{server.url}/delay/0.2" for _ in range(40)):
+                ok += result.ok
+            print(f"{ok}/40 OK in {time.perf_counter() - start:.2f}s")
+
+    asyncio.run(fetch_all())
+
+# =============================================================================
+# 11. STREAMING LARGE RESPONSES
+# =============================================================================
+print("\n" + "="*50)
+print("11. STREAMING LARGE RESPONSES")
+print("="*50)
+
+# response.content / .text / .json() load the whole body into memory. With
+# stream=True the body is read chunk by chunk instead (streaming.py).
+import os
+import tempfile
+from streaming import download_file, iter_ndjson
+
+with stub_server() as server, requests.Session() as session, tempfile.TemporaryDirectory() as tmp:
+    print("\n--- Chunked Download with Checksum ---")
+    size = 20 * 1024 * 1024
+    result = download_file(f"{server.url}/bytes/{size}", os.path.join(tmp, "export.bin"), session)
+    print(f"Wrote {result.size:,} bytes, sha256 {result.sha256[:16]}...")
+
+    print("\n--- Resuming after Dropped Connections ---")
+    # The stub cuts each response after 8 MB; the download continues with Range requests
+    result = download_file(f"{server.url}/bytes/{size}?fail_after={8 * 1024 * 1024}",
+                           os.path.join(tmp, "resumed.bin"), session, sha256=result.sha256)
+    print(f"Wrote {result.size:,} bytes in {result.requests} requests, checksum verified")
+
+    print("\n--- Incremental NDJSON ---")
+    with session.get(f"{server.url}/ndjson/100000", stream=True, timeout=10) as response:
+        count = sum(1 for _ in iter_ndjson(response))
+    print(f"Parsed {count:,} records one line at a time")
+
+# =============================================================================
+# 12. ON-DISK HTTP CACHE
+# =============================================================================
+print("\n" + "="*50)
+print("12. ON-DISK HTTP CACHE")
+print("="*50)
+
+# CachedSession is a requests.Session that keeps GET responses on disk and
+# honors Cache-Control; stale pages are revalidated with ETag (304, no body).
+# lab6 and lab8 use the same cache file, so re-runs skip unchanged pages.
+from http_cache import CachedSession, HTTPCache
+
+with stub_server() as server, tempfile.TemporaryDirectory() as tmp, \
+        CachedSession(HTTPCache(os.path.join(tmp, "http-cache.sqlite"))) as session:
+
+    print("\n--- Fresh for 60s: Served from Disk ---")
+    for _ in range(3):
+        response = session.get(f"{server.url}/cache/60")
+        print(f"Status: {response.status_code}, {len(response.content):,} bytes, {response.from_cache}")
+
+    print("\n--- max-age=0: Revalidated with If-None-Match ---")
+    for _ in range(3):
+        response = session.get(f"{server.url}/cache/0")
+        print(f"Status: {response.status_code}, {len(response.content):,} bytes, {response.from_cache}")
+
+    print(f"\nCache stats: {session.cache.stats()}")
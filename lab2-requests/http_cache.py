@@ -0,0 +1,248 @@
+"""On-disk HTTP cache shared by the labs that fetch web pages (lab2, lab6).
+
+    session = CachedSession()               # drop-in requests.Session
+    response = session.get(url)             # served from disk while fresh
+    print(session.cache.stats())
+
+GET responses with status 200 are stored in one SQLite file (HTTP_CACHE_PATH,
+default ~/.cache/python-labs-http.sqlite), keyed by URL:
+- Cache-Control max-age (or Expires) decides how long an entry is fresh;
+  no-store is never stored, no-cache is always revalidated
+- a stale entry is revalidated with If-None-Match / If-Modified-Since, and
+  a 304 reuses the stored body instead of downloading it again
+- without max-age/Expires, entries with Last-Modified stay fresh for 10% of
+  their age (capped at a day), as browsers do
+- requests carrying Authorization or Cookie headers bypass the cache, and an
+  entry stored with Vary is only reused for requests whose varying headers
+  match the ones it was stored for
+
+stats() reports hits, revalidations, misses, hit ratio and bytes saved.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_PATH = os.getenv('HTTP_CACHE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'python-labs-http.sqlite'))
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_AGE = 24 * 3600
+# Responses to these are per user: never stored, never served from the cache
+CREDENTIAL_HEADERS = ('Authorization', 'Cookie')
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+def http_date(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+def freshness_lifetime(headers, now: float) -> float:
+    """Seconds a response stays fresh from now (0 = revalidate on every use)"""
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-cache' in directives:
+        return 0.0
+    age = headers.get('Age') or ''
+    age = float(age) if age.isdigit() else 0.0
+    max_age = directives.get('max-age') or ''
+    if max_age.isdigit():
+        return max(0.0, int(max_age) - age)
+    date = http_date(headers.get('Date')) or now
+    expires = http_date(headers.get('Expires'))
+    if expires is not None:
+        return max(0.0, expires - date - age)
+    last_modified = http_date(headers.get('Last-Modified'))
+    if last_modified is not None:
+        return min(HEURISTIC_MAX_AGE, max(0.0, (date - last_modified) * HEURISTIC_FRACTION))
+    return 0.0
+
+def vary_values(vary: Optional[str], request_headers) -> Optional[Dict[str, Optional[str]]]:
+    """The request header values a response with this Vary header was selected by"""
+    names = [name.strip().lower() for name in (vary or '').split(',') if name.strip()]
+    return {name: request_headers.get(name) for name in names} or None
+
+def is_storable(response: requests.Response) -> bool:
+    """200s that are allowed in a cache and either fresh for a while or revalidatable"""
+    headers = response.headers
+    if response.status_code != 200 or headers.get('Vary', '').strip() == '*':
+        return False
+    if 'no-store' in parse_cache_control(headers.get('Cache-Control')):
+        return False
+    return bool(headers.get('ETag') or headers.get('Last-Modified') or freshness_lifetime(headers, time.time()))
+
+class HTTPCache:
+    """SQLite store of responses plus hit/miss counters; safe to share across threads"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+        conn = self._connect()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, status INTEGER NOT NULL, '
+            'headers TEXT NOT NULL, body BLOB NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL, '
+            'vary TEXT)')
+        # Cache files written before `vary` existed
+        if 'vary' not in {row[1] for row in conn.execute('PRAGMA table_info(responses)')}:
+            conn.execute('ALTER TABLE responses ADD COLUMN vary TEXT')
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets other processes read while one writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, url: str):
+        """(status, headers, body, expires_at, vary) or None"""
+        row = self._connect().execute(
+            'SELECT status, headers, body, expires_at, vary FROM responses WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        status, headers, body, expires_at, vary = row
+        return status, CaseInsensitiveDict(json.loads(headers)), body, expires_at, json.loads(vary) if vary else None
+
+    def store(self, url: str, status: int, headers, body: bytes, vary: Optional[dict] = None):
+        """`vary`: the request header values named by the response's Vary header"""
+        now = time.time()
+        self._connect().execute(
+            'INSERT OR REPLACE INTO responses (url, status, headers, body, stored_at, expires_at, vary) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (url, status, json.dumps(dict(headers)), body, now, now + freshness_lifetime(headers, now),
+             json.dumps(vary) if vary else None))
+
+    def refresh(self, url: str, headers):
+        """Merge the headers of a 304 into the entry and restart its freshness"""
+        entry = self.lookup(url)
+        if entry is not None:
+            status, stored, body, _, vary = entry
+            stored.update({key: value for key, value in headers.items()
+                           if key.lower() not in ('content-length', 'content-encoding', 'transfer-encoding')})
+            self.store(url, status, stored, body, vary)
+
+    def delete(self, url: str):
+        self._connect().execute('DELETE FROM responses WHERE url = ?', (url,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM responses')
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def record(self, outcome: str, body_size: int):
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+                self.bytes_saved += body_size
+            elif outcome == 'revalidated':
+                self.revalidated += 1
+                self.bytes_saved += body_size
+            else:
+                self.misses += 1
+                self.bytes_downloaded += body_size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            'path': self.path,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            # Revalidated responses count as hits: the body came from disk
+            'hit_ratio': round((self.hits + self.revalidated) / lookups, 4) if lookups else None,
+            'bytes_saved': self.bytes_saved,
+            'bytes_downloaded': self.bytes_downloaded,
+        }
+
+class CachedSession(requests.Session):
+    """requests.Session whose plain GETs go through an HTTPCache.
+
+    Responses carry `from_cache`: 'hit', 'revalidated' or 'miss'. Streamed
+    requests (stream=True), other methods and requests with credentials
+    (Authorization or Cookie, from the call or the session) bypass the cache.
+    """
+
+    def __init__(self, cache: Optional[HTTPCache] = None):
+        super().__init__()
+        self.cache = cache or HTTPCache()
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET' or kwargs.get('stream') or args:
+            return super().request(method, url, *args, **kwargs)
+        # Merged with the session's headers, cookies and auth, as the request will be sent
+        prepared = self.prepare_request(requests.Request(
+            'GET', url, params=kwargs.get('params'), headers=kwargs.get('headers'),
+            cookies=kwargs.get('cookies'), auth=kwargs.get('auth')))
+        if any(name in prepared.headers for name in CREDENTIAL_HEADERS):
+            return super().request(method, url, **kwargs)
+        key = prepared.url
+        entry = self.cache.lookup(key)
+        if entry is not None and entry[4] and vary_values(','.join(entry[4]), prepared.headers) != entry[4]:
+            # Stored for other values of the headers it varies on: fetch without validators
+            entry = None
+        if entry is not None and entry[3] > time.time():
+            self.cache.record('hit', len(entry[2]))
+            return self._cached_response(key, entry, 'hit')
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            etag, last_modified = entry[1].get('ETag'), entry[1].get('Last-Modified')
+            if etag:
+                headers.setdefault('If-None-Match', etag)
+            if last_modified:
+                headers.setdefault('If-Modified-Since', last_modified)
+        response = super().request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(key, response.headers)
+            self.cache.record('revalidated', len(entry[2]))
+            return self._cached_response(key, self.cache.lookup(key) or entry, 'revalidated')
+        self.cache.record('miss', len(response.content))
+        if is_storable(response):
+            self.cache.store(key, response.status_code, response.headers, response.content,
+                             vary_values(response.headers.get('Vary'), prepared.headers))
+        else:
+            self.cache.delete(key)
+        response.from_cache = 'miss'
+        return response
+
+    def close(self):
+        super().close()
+        self.cache.close()
+
+    @staticmethod
+    def _cached_response(url: str, entry, outcome: str) -> requests.Response:
+        status, headers, body, _, _ = entry
+        response = requests.Response()
+        response.status_code = status
+        response.headers = headers
+        response._content = body
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(headers)
+        response.from_cache = outcome
+        return response
@@ -0,0 +1,278 @@
+"""Reusable HTTP clients for bulk API calls.
+
+- HTTPClient: pooled `requests.Session` (keep-alive), threads for fetch_many
+- AsyncHTTPClient: `httpx.AsyncClient` with HTTP/2 when `h2` is installed
+
+Both apply the same policy to every request:
+- a default timeout
+- bounded concurrency (connection pool size = max in-flight requests)
+- exponential backoff with jitter on 5xx, timeouts and connection errors
+  (idempotent methods only, Retry-After honored)
+- an optional per-host rate limit
+
+fetch_many(urls) yields a FetchResult per URL in completion order.
+requests has no HTTP/2 support, so the sync client speaks HTTP/1.1.
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Iterable, Iterator, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = 10.0
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+class FetchResult(NamedTuple):
+    url: str
+    status: Optional[int]
+    content: Optional[bytes]
+    error: Optional[str]
+    attempts: int
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+class RetryPolicy:
+    """Exponential backoff: base * 2**attempt, capped, with full jitter"""
+
+    def __init__(self, retries: int = 3, backoff_base: float = 0.2, backoff_max: float = 10.0):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def should_retry(self, method: str, attempt: int, status: Optional[int] = None) -> bool:
+        if attempt >= self.retries or method.upper() not in RETRY_METHODS:
+            return False
+        return status is None or status >= 500
+
+    def max_attempts(self, method: str) -> int:
+        return self.retries + 1 if method.upper() in RETRY_METHODS else 1
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_max))
+        return delay
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1/rate seconds apart.
+
+    reserve() books the next free slot and returns how long to wait for it,
+    so the same limiter works with time.sleep and asyncio.sleep.
+    """
+
+    def __init__(self, rate: Optional[float] = None, per_host: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.per_host = per_host or {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url: str) -> float:
+        host = urlsplit(url).netloc
+        rate = self.per_host.get(host, self.rate)
+        if not rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        return slot - now
+
+class HTTPClient:
+    """Thread-safe sync client over one pooled requests.Session.
+
+        with HTTPClient(max_concurrency=20, rate_limit=50) as client:
+            response = client.get('https://httpbin.org/json')
+            for result in client.fetch_many(urls):
+                ...
+    """
+
+    def __init__(self, max_concurrency: int = 10, timeout: float = DEFAULT_TIMEOUT,
+                 retry: Optional[RetryPolicy] = None, rate_limit: Optional[float] = None,
+                 host_rate_limits: Optional[Dict[str, float]] = None, headers: Optional[Dict[str, str]] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.limiter = HostRateLimiter(rate_limit, host_rate_limits)
+        self.session = requests.Session()
+        # One keep-alive pool per host, sized so no worker thread waits for a socket
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(headers or {})
+
+    def _send(self, method: str, url: str, **kwargs):
+        """(response, attempts)"""
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            time.sleep(self.limiter.reserve(url))
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.Timeout, requests.ConnectionError):
+                if not self.retry.should_retry(method, attempt):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+            else:
+                if not self.retry.should_retry(method, attempt, response.status_code):
+                    return response, attempt + 1
+                response.close()
+                time.sleep(self.retry.delay(attempt, response.headers.get('Retry-After')))
+            attempt += 1
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send with retries; returns the last response, or raises the last transport error"""
+        response, _ = self._send(method, url, **kwargs)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def fetch(self, url: str, method: str = 'GET', **kwargs) -> FetchResult:
+        """Like request(), but errors are captured in the result instead of raised"""
+        start = time.perf_counter()
+        try:
+            response, attempts = self._send(method, url, **kwargs)
+            return FetchResult(url, response.status_code, response.content, None, attempts, time.perf_counter() - start)
+        except requests.RequestException as exc:
+            # Transport errors are retried until the budget runs out
+            return FetchResult(url, None, None, repr(exc), self.retry.max_attempts(method), time.perf_counter() - start)
+
+    def fetch_many(self, urls: Iterable[str], method: str = 'GET', **kwargs) -> Iterator[FetchResult]:
+        """Fetch with at most max_concurrency requests in flight, yielding as each completes"""
+        urls = iter(urls)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            pending = set()
+            for url in urls:
+                pending.add(pool.submit(self.fetch, url, method, **kwargs))
+                if len(pending) >= self.max_concurrency:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    url = next(urls, None)
+                    if url is not None:
+                        pending.add(pool.submit(self.fetch, url, method, **kwargs))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AsyncHTTPClient:
+    """Async client over one httpx.AsyncClient.
+
+        async with AsyncHTTPClient(max_concurrency=50) as client:
+            async for result in client.fetch_many(urls):
+                ...
+    """
+
+    def __init__(self, max_concurrency: int = 10, timeout: float = DEFAULT_TIMEOUT,
+                 retry: Optional[RetryPolicy] = None, rate_limit: Optional[float] = None,
+                 host_rate_limits: Optional[Dict[str, float]] = None, headers: Optional[Dict[str, str]] = None,
+                 http2: bool = True, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.max_concurrency = max_concurrency
+        self.retry = retry or RetryPolicy()
+        self.limiter = HostRateLimiter(rate_limit, host_rate_limits)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            http2=http2 and HTTP2_AVAILABLE,
+            timeout=timeout,
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            transport=transport,
+        )
+
+    async def _send(self, method: str, url: str, **kwargs):
+        """(response, attempts); the semaphore bounds in-flight requests, not backoff sleeps"""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.limiter.reserve(url))
+            try:
+                async with self._semaphore:
+                    response = await self.client.request(method, url, **kwargs)
+            except (httpx.TimeoutException, httpx.TransportError):
+                if not self.retry.should_retry(method, attempt):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+            else:
+                if not self.retry.should_retry(method, attempt, response.status_code):
+                    return response, attempt + 1
+                await asyncio.sleep(self.retry.delay(attempt, response.headers.get('Retry-After')))
+            attempt += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send with retries; returns the last response, or raises the last transport error"""
+        response, _ = await self._send(method, url, **kwargs)
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def fetch(self, url: str, method: str = 'GET', **kwargs) -> FetchResult:
+        """Like request(), but errors are captured in the result instead of raised"""
+        start = time.perf_counter()
+        try:
+            response, attempts = await self._send(method, url, **kwargs)
+            return FetchResult(url, response.status_code, response.content, None, attempts, time.perf_counter() - start)
+        except httpx.HTTPError as exc:
+            return FetchResult(url, None, None, repr(exc), self.retry.max_attempts(method), time.perf_counter() - start)
+
+    async def fetch_many(self, urls: Iterable[str], method: str = 'GET', **kwargs) -> AsyncIterator[FetchResult]:
+        """Fetch with at most max_concurrency requests in flight, yielding as each completes.
+
+        Only a window of tasks is created at a time, so millions of URLs do not
+        turn into millions of pending tasks.
+        """
+        urls = iter(urls)
+        window = self.max_concurrency * 2
+        pending = set()
+        try:
+            for url in urls:
+                pending.add(asyncio.ensure_future(self.fetch(url, method, **kwargs)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+                    url = next(urls, None)
+                    if url is not None:
+                        pending.add(asyncio.ensure_future(self.fetch(url, method, **kwargs)))
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,131 @@
+"""Constant-memory handling of large responses.
+
+    result = download_file(url, 'export.bin', sha256='...')   # chunked, resumable, verified
+    for record in iter_ndjson(session.get(url, stream=True)):  # one JSON line at a time
+        ...
+
+`response.content`, `.text` and `.json()` hold the whole body in memory;
+these helpers only ever hold one chunk.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Any, BinaryIO, Iterable, Iterator, NamedTuple, Optional
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+CHUNK_SIZE = 1024 * 1024
+# Network reads while downloading: a dropped connection loses at most the read in progress
+READ_SIZE = 64 * 1024
+DEFAULT_TIMEOUT = 10.0
+
+class ChecksumMismatch(ValueError):
+    pass
+
+class DownloadResult(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    # Bytes taken from an earlier partial download instead of the network
+    resumed_bytes: int
+    requests: int
+
+def copy_chunks(chunks: Iterable[bytes], out: BinaryIO, hasher=None) -> int:
+    """Write chunks to `out`, updating `hasher` on the way; returns bytes written"""
+    written = 0
+    for chunk in chunks:
+        if chunk:
+            out.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+            written += len(chunk)
+    return written
+
+def hash_file(path: str, hasher, chunk_size: int = CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher
+
+def download_file(url: str, path: str, session: Optional[requests.Session] = None, sha256: Optional[str] = None,
+                  chunk_size: int = READ_SIZE, timeout: float = DEFAULT_TIMEOUT, max_resumes: int = 3) -> DownloadResult:
+    """Stream `url` to `path` in chunks, hashing as it goes.
+
+    The body goes to `path + '.part'` and is renamed into place once complete
+    (and matching `sha256`, if given). If the connection drops, or a previous
+    run left a .part file, the download continues with a Range request;
+    a server that ignores Range (200 instead of 206) restarts it from zero.
+    The body is read in `chunk_size` pieces without content decoding, so
+    every byte received before a drop is on disk and offsets match Range.
+    """
+    session = session or requests.Session()
+    part_path = path + '.part'
+    hasher = hashlib.sha256()
+    offset = resumed = 0
+    if os.path.exists(part_path):
+        # Re-hash what is already on disk so the final digest covers the whole file
+        hash_file(part_path, hasher)
+        offset = resumed = os.path.getsize(part_path)
+
+    requests_made = 0
+    while True:
+        # identity: Range offsets count the bytes as stored, not a compressed encoding of them
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+        requests_made += 1
+        with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            if response.status_code == 416 and offset:
+                # Nothing left to send: the .part file is already complete
+                total = re.search(r'/(\d+)$', response.headers.get('Content-Range', ''))
+                if total and int(total.group(1)) == offset:
+                    break
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                hasher = hashlib.sha256()
+                offset = resumed = 0
+            error = None
+            with open(part_path, 'ab' if offset else 'wb') as out:
+                try:
+                    copy_chunks(response.raw.stream(chunk_size, decode_content=False), out, hasher)
+                except (requests.ConnectionError, ProtocolError, ReadTimeoutError) as exc:
+                    error = exc
+            # Every chunk that reached the file is also in the hash, so resume right after it
+            offset = os.path.getsize(part_path)
+            if error is None:
+                break
+            if requests_made > max_resumes:
+                raise error
+
+    digest = hasher.hexdigest()
+    if sha256 is not None and digest != sha256.lower():
+        os.remove(part_path)
+        raise ChecksumMismatch(f'{url}: expected sha256 {sha256}, got {digest}')
+    os.replace(part_path, path)
+    return DownloadResult(path, offset, digest, resumed, requests_made)
+
+def urlopen_to_file(url: str, path: str, chunk_size: int = CHUNK_SIZE, timeout: float = DEFAULT_TIMEOUT) -> str:
+    """urllib equivalent of a streamed download: read() in fixed-size chunks; returns the sha256"""
+    import urllib.request
+    hasher = hashlib.sha256()
+    with urllib.request.urlopen(url, timeout=timeout) as response, open(path, 'wb') as out:
+        copy_chunks(iter(lambda: response.read(chunk_size), b''), out, hasher)
+    return hasher.hexdigest()
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a byte stream on newlines, carrying partial lines across chunk boundaries"""
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+def iter_ndjson(response: requests.Response, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Parse newline-delimited JSON as it arrives (open the response with stream=True)"""
+    for line in iter_lines(response.iter_content(chunk_size)):
+        if line.strip():
+            yield json.loads(line)
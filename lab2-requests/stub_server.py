@@ -0,0 +1,187 @@
+"""Local stand-in for the httpbin.org endpoints used in this lab.
+
+    with stub_server() as server:
+        requests.get(f'{server.url}/json')
+
+Endpoints:
+- GET  /json                     fixed JSON document
+- GET  /status/<code>            empty response with that status
+- GET  /delay/<seconds>          JSON after sleeping
+- GET  /flaky/<key>?failures=N   503 for the first N requests per key, then 200
+- GET  /headers                  echoes the request headers
+- GET  /bytes/<n>                n deterministic bytes (see stub_bytes); honors Range,
+                                 ?fail_after=N drops the connection after N bytes
+- GET  /ndjson/<n>               n JSON lines
+- GET  /cache/<max_age>          50 KB page with ETag, Last-Modified and
+                                 Cache-Control: max-age; 304 on a matching If-None-Match
+                                 (?vary=<header>: Vary on that header, whose value the page shows)
+- POST /post                     echoes the JSON body
+"""
+import json
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+STREAM_CHUNK = 64 * 1024
+
+PATTERN = bytes(range(251))
+
+def stub_bytes(start: int, end: int) -> bytes:
+    """Bytes start..end-1 of every /bytes/<n> body (byte i is i % 251)"""
+    offset = start % len(PATTERN)
+    return (PATTERN * ((end - start) // len(PATTERN) + 2))[offset:offset + end - start]
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.lock = threading.Lock()
+        # Requests seen per path (without query string)
+        self.hits = Counter()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def send_json(self, payload, status: int = 200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_empty(self, status: int):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip('/').split('/')
+        with self.server.lock:
+            self.server.hits[url.path] += 1
+            hits = self.server.hits[url.path]
+
+        if url.path == '/json':
+            self.send_json({'slideshow': {'title': 'Sample Slide Show', 'author': 'Yours Truly'}})
+        elif parts[0] == 'status' and len(parts) == 2:
+            self.send_empty(int(parts[1]))
+        elif parts[0] == 'delay' and len(parts) == 2:
+            time.sleep(float(parts[1]))
+            self.send_json({'delay': float(parts[1])})
+        elif parts[0] == 'flaky' and len(parts) == 2:
+            failures = int(query.get('failures', ['2'])[0])
+            if hits <= failures:
+                self.send_empty(503)
+            else:
+                self.send_json({'key': parts[1], 'attempt': hits})
+        elif parts[0] == 'cache' and len(parts) == 2:
+            self.send_cacheable(int(parts[1]), query['vary'][0] if 'vary' in query else None)
+        elif url.path == '/headers':
+            self.send_json({'headers': dict(self.headers)})
+        elif parts[0] == 'bytes' and len(parts) == 2:
+            self.send_bytes(int(parts[1]), int(query['fail_after'][0]) if 'fail_after' in query else None)
+        elif parts[0] == 'ndjson' and len(parts) == 2:
+            lines = (json.dumps({'id': i, 'value': f'row {i}'}).encode() + b'\n' for i in range(int(parts[1])))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for line in lines:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_empty(404)
+
+    def send_cacheable(self, max_age: int, vary: Optional[str] = None):
+        variant = self.headers.get(vary, '') if vary else ''
+        etag = f'"page-v1{"-" + variant if variant else ""}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Mon, 06 Oct 2025 08:00:00 GMT')
+        self.send_header('Cache-Control', f'max-age={max_age}')
+        if vary:
+            self.send_header('Vary', vary)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'<html><body>' + b'<p>cached page</p>' * 2800 + f'<p>{variant}</p>'.encode() + b'</body></html>'
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_bytes(self, size: int, fail_after=None):
+        """Stream the body in chunks, or the part asked for with Range: bytes=start-[end]"""
+        start, end, status = 0, size, 200
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = min(size, int(match.group(2)) + 1) if match.group(2) else size
+            if start >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            status = 206
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{size}')
+        self.end_headers()
+        sent = 0
+        for offset in range(start, end, STREAM_CHUNK):
+            chunk = stub_bytes(offset, min(end, offset + STREAM_CHUNK))
+            if fail_after is not None and sent + len(chunk) > fail_after:
+                self.wfile.write(chunk[:fail_after - sent])
+                self.close_connection = True
+                return
+            self.wfile.write(chunk)
+            sent += len(chunk)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.hits[self.path] += 1
+        if self.path != '/post':
+            self.send_empty(404)
+            return
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        self.send_json({'json': payload, 'data': body.decode('utf-8', 'replace')})
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def stub_server():
+    """Serve the stub on a free local port; yields the server (base URL in `.url`)"""
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,106 @@
+"""Thread-safe, compact in-memory item repository.
+
+- Stable, monotonically increasing ids (deleting an item never renumbers others)
+- O(1) lookup: ids are dense, so the id is the position in the column arrays
+- Keyset pagination: `list(after=<id>, limit=n)` seeks directly to the cursor,
+  so page cost depends on `limit`, not on how deep into the store the page is
+- Secondary index on `is_done` so filtered pages skip non-matching items;
+  unfiltered pages merge its two halves, so neither walks deleted ids
+
+Items are stored column-wise rather than as pydantic models: one list slot per
+text (short texts interned so duplicates share one string), one bit per
+`is_done` flag and 8 bytes per id in the `is_done` index. Callers build
+response models from the returned (id, text, is_done) tuples.
+"""
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+# Short texts repeat often ("buy milk"); long ones rarely do and would only
+# grow the interpreter's intern table
+INTERN_MAX_LEN = 64
+
+class ItemStore:
+    """Items keyed by stable integer ids"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts: List[Optional[str]] = []  # indexed by id, None once deleted
+        self._done = bytearray()                # bit-packed is_done, bit (id & 7) of byte id >> 3
+        self._ids_by_done: Dict[bool, array] = {False: array('q'), True: array('q')}
+        self._count = 0
+        self._tombstones = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _is_done(self, item_id: int) -> bool:
+        return bool(self._done[item_id >> 3] & (1 << (item_id & 7)))
+
+    def add(self, text: str, is_done: bool = False) -> int:
+        if len(text) <= INTERN_MAX_LEN:
+            text = sys.intern(text)
+        with self._lock:
+            item_id = len(self._texts)
+            if item_id & 7 == 0:
+                self._done.append(0)
+            if is_done:
+                self._done[item_id >> 3] |= 1 << (item_id & 7)
+            self._ids_by_done[bool(is_done)].append(item_id)
+            # Published last: get() only sees the id once its is_done bit is set
+            self._texts.append(text)
+            self._count += 1
+            return item_id
+
+    def get(self, item_id: int) -> Optional[Tuple[str, bool]]:
+        # Reads of a list slot are atomic under the GIL, so lookups need no lock
+        if not 0 <= item_id < len(self._texts):
+            return None
+        text = self._texts[item_id]
+        if text is None:
+            return None
+        return text, self._is_done(item_id)
+
+    def delete(self, item_id: int) -> bool:
+        with self._lock:
+            if not 0 <= item_id < len(self._texts) or self._texts[item_id] is None:
+                return False
+            self._texts[item_id] = None
+            self._count -= 1
+            self._tombstones += 1
+            if self._tombstones > self._count:
+                self._compact()
+            return True
+
+    def _compact(self):
+        """Drop deleted ids from the is_done index once they outnumber live items"""
+        texts = self._texts
+        for is_done, ids in self._ids_by_done.items():
+            self._ids_by_done[is_done] = array('q', (item_id for item_id in ids if texts[item_id] is not None))
+        self._tombstones = 0
+
+    def list(self, after: Optional[int] = None, limit: int = 10,
+             is_done: Optional[bool] = None) -> List[Tuple[int, str, bool]]:
+        """Up to `limit` (id, text, is_done) tuples with id > `after`, optionally filtered on is_done"""
+        texts = self._texts
+        page = []
+        with self._lock:
+            # Walk the is_done index (merging both halves when unfiltered): deleted ids
+            # are compacted out of it, while `texts` keeps a None slot per deleted id
+            halves = [False, True] if is_done is None else [is_done]
+            ids = [self._ids_by_done[done] for done in halves]
+            positions = [bisect_right(half, after) if after is not None else 0 for half in ids]
+            while len(page) < limit:
+                best = None
+                for index, half in enumerate(ids):
+                    if positions[index] < len(half) and (best is None or half[positions[index]] < ids[best][positions[best]]):
+                        best = index
+                if best is None:
+                    break
+                item_id = ids[best][positions[best]]
+                positions[best] += 1
+                if texts[item_id] is not None:
+                    page.append((item_id, texts[item_id], halves[best]))
+            return page
@@ -3,7 +3,9 @@
 # =============================================================================
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+
+from item_store import ItemStore
 
 app = FastAPI()
 
@@ -63,11 +65,25 @@ class Item(BaseModel):
     text: str
     is_done: bool = False
 
-@app.post("/items/")
+class StoredItem(Item):
+    """Item as returned by the API, with its stable id"""
+    id: int
+
+# =============================================================================
+# STEP 10: ITEM REPOSITORY
+# =============================================================================
+# The list above is fine for learning, but list positions shift on delete and
+# items[0:limit] always starts from the beginning. The repository gives stable
+# ids, O(1) lookup, cursor pagination and a lock for concurrent writers.
+# It keeps items in a compact column form (text + one bit for is_done) and
+# pydantic models are only built for responses.
+store = ItemStore()
+
+@app.post("/items/", response_model=StoredItem)
 def create_item(item: Item):
     """Create item using Pydantic model"""
-    items.append(item)
-    return item
+    item_id = store.add(item.text, item.is_done)
+    return StoredItem(id=item_id, text=item.text, is_done=item.is_done)
 
 # @app.get("/items/{item_id}")
 # def get_item(item_id: int) -> Item:
@@ -80,18 +96,27 @@ def create_item(item: Item):
 # =============================================================================
 # STEP 9: RESPONSE MODELS
 # =============================================================================
-@app.get("/items/", response_model=List[Item])
-def list_items(limit: int = 10):
-    """List items with response model"""
-    return items[0:limit]
+@app.get("/items/", response_model=List[StoredItem])
+def list_items(limit: int = 10, after: Optional[int] = None, is_done: Optional[bool] = None):
+    """List items with response model; pass the last id seen as `after` for the next page"""
+    return [StoredItem(id=item_id, text=text, is_done=done)
+            for item_id, text, done in store.list(after=after, limit=limit, is_done=is_done)]
 
-@app.get("/items/{item_id}", response_model=Item)
-def get_item(item_id: int) -> Item:
+@app.get("/items/{item_id}", response_model=StoredItem)
+def get_item(item_id: int) -> StoredItem:
     """Get item with response model"""
-    if item_id < len(items):
-        return items[item_id]
-    else:
+    found = store.get(item_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Item {item_id} not found")
+    text, is_done = found
+    return StoredItem(id=item_id, text=text, is_done=is_done)
+
+@app.delete("/items/{item_id}")
+def delete_item(item_id: int):
+    """Delete an item; other items keep their ids"""
+    if not store.delete(item_id):
         raise HTTPException(status_code=404, detail=f"Item {item_id} not found")
+    return {"deleted": item_id}
 # =============================================================================
 if __name__ == "__main__":
     import uvicorn
@@ -1,13 +1,29 @@
-from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel
-from typing import List, Annotated
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import AsyncIterator, List, Annotated, Optional
+import json
+import os
+import re
+import time
 import models
-from database import engine, SessionLocal
-from sqlalchemy.orm import Session
+from database import open_session, close_session, run_db, pool_metrics
+from question_cache import BACKENDS, QuestionCache
+from schema import verify_schema
+from sqlalchemy import func, insert, literal_column, select, table, text
+from sqlalchemy.orm import Session, selectinload
 
-app = FastAPI()
+# The schema is created and migrated with Alembic (`alembic upgrade head`);
+# startup only checks the database is at the latest revision.
+# SCHEMA_CHECK=0 skips the check.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.getenv('SCHEMA_CHECK', '1').lower() in ('1', 'true', 'yes'):
+        await verify_schema()
+    yield
 
-models.Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan)
 
 
 class ChoiceBase(BaseModel):
@@ -18,19 +34,51 @@ class QuestionBase(BaseModel):
     question_text: str
     choices: List[ChoiceBase]
 
+# Response models, read straight from ORM objects
+class ChoiceOut(ChoiceBase):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    question_id: int
+
+class QuestionOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    question_text: str
+
+class QuestionWithChoices(QuestionOut):
+    choices: List[ChoiceOut]
+
 # =============================================================================
 # DATABASE DEPENDENCY
 # =============================================================================
 
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    # Session or AsyncSession depending on DATABASE_MODE; query functions below
+    # take a sync Session and are dispatched through run_db in both modes
+    db = open_session()
     try:
+        await pool_metrics.checkout(db)
         yield db
     finally:
-        db.close()
+        await close_session(db)
 
 db_dependency = Annotated[Session, Depends(get_db)]
 
+# =============================================================================
+# QUESTION CACHE
+# =============================================================================
+
+# QUESTION_CACHE=lru (default), redis (shared by all workers, QUESTION_CACHE_URL) or off
+question_cache = None
+CACHE_BACKEND = os.getenv('QUESTION_CACHE', 'lru')
+CACHE_TTL = float(os.getenv('QUESTION_CACHE_TTL', '300'))
+if CACHE_BACKEND == 'lru':
+    question_cache = QuestionCache(BACKENDS['lru'](
+        maxsize=int(os.getenv('QUESTION_CACHE_SIZE', '10000')), ttl=CACHE_TTL))
+elif CACHE_BACKEND == 'redis':
+    question_cache = QuestionCache(BACKENDS['redis'](
+        url=os.getenv('QUESTION_CACHE_URL', 'redis://localhost:6379/0'), ttl=CACHE_TTL))
+
 # =============================================================================
 # API ENDPOINTS
 # =============================================================================
@@ -40,9 +88,7 @@ def root():
     """Root endpoint - Welcome message"""
     return {"message": "Welcome to Quiz API", "status": "running"}
 
-@app.post('/questions/')
-def create_questions(question: QuestionBase, db: db_dependency):
-    """Create a new question with choices"""
+def insert_question(db: Session, question: QuestionBase) -> int:
     db_question = models.Questions(question_text=question.question_text)
     db.add(db_question)
     db.commit()
@@ -51,22 +97,208 @@ def create_questions(question: QuestionBase, db: db_dependency):
         db_choice = models.Choices(choice_text=choice.choice_text, is_correct=choice.is_correct, question_id=db_question.id)
         db.add(db_choice)
     db.commit()
+    return db_question.id
+
+@app.post('/questions/')
+async def create_questions(question: QuestionBase, db: db_dependency):
+    """Create a new question with choices"""
+    question_id = await run_db(db, insert_question, question)
+    if question_cache is not None:
+        await question_cache.invalidate([question_id])
+
+# =============================================================================
+# BULK IMPORT
+# =============================================================================
+
+BULK_CHUNK_SIZE = 1000
+
+def insert_question_chunk(db: Session, chunk: List[QuestionBase]) -> List[int]:
+    """Insert one chunk of questions and their choices; returns the new question ids"""
+    question_ids = db.scalars(
+        insert(models.Questions).returning(models.Questions.id, sort_by_parameter_order=True),
+        [{'question_text': question.question_text} for question in chunk],
+    ).all()
+    choice_rows = [
+        {'choice_text': choice.choice_text, 'is_correct': choice.is_correct, 'question_id': question_id}
+        for question, question_id in zip(chunk, question_ids)
+        for choice in question.choices
+    ]
+    if choice_rows:
+        db.execute(insert(models.Choices), choice_rows)
+    return question_ids
+
+async def bulk_insert_questions(db, questions: List[QuestionBase], chunk_size: int = BULK_CHUNK_SIZE) -> AsyncIterator[dict]:
+    """Insert questions and their choices in one transaction, yielding progress per chunk.
+
+    Each chunk costs two statements: a multi-row INSERT ... RETURNING id for the
+    questions and an executemany INSERT for all of their choices.
+    """
+    start = time.perf_counter()
+    inserted_questions = inserted_choices = 0
+    question_ids = []
+
+    def progress(committed: bool) -> dict:
+        elapsed = time.perf_counter() - start
+        rows = inserted_questions + inserted_choices
+        return {
+            'questions': inserted_questions,
+            'choices': inserted_choices,
+            'total_questions': len(questions),
+            'elapsed_s': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed else None,
+            'committed': committed,
+        }
+
+    try:
+        for offset in range(0, len(questions), chunk_size):
+            chunk = questions[offset:offset + chunk_size]
+            question_ids += await run_db(db, insert_question_chunk, chunk)
+            inserted_questions += len(chunk)
+            inserted_choices += sum(len(question.choices) for question in chunk)
+            yield progress(committed=False)
+        await run_db(db, Session.commit)
+    except Exception:
+        await run_db(db, Session.rollback)
+        raise
+    if question_cache is not None:
+        await question_cache.invalidate(question_ids)
+    yield progress(committed=True)
 
-@app.get('/questions/{question_id}')
-def read_questions(question_id: int, db: db_dependency):
+@app.post('/questions/bulk')
+async def create_questions_bulk(questions: List[QuestionBase], db: db_dependency, stream: bool = False):
+    """Create many questions with choices in a single transaction.
+
+    With `?stream=true` the response is NDJSON with one progress line per
+    chunk, ending with a line where `committed` is true.
+    """
+    if not stream:
+        async for summary in bulk_insert_questions(db, questions):
+            pass
+        return summary
+
+    async def stream_progress():
+        # The streamed body outlives the request dependency, so use a dedicated session
+        stream_db = open_session()
+        try:
+            async for update in bulk_insert_questions(stream_db, questions):
+                yield json.dumps(update) + '\n'
+        finally:
+            await close_session(stream_db)
+
+    return StreamingResponse(stream_progress(), media_type='application/x-ndjson')
+
+MAX_QUESTION_IDS = 500
+
+def select_questions_with_choices(db: Session, ids: List[int]):
+    return db.scalars(
+        select(models.Questions)
+        .where(models.Questions.id.in_(ids))
+        .options(selectinload(models.Questions.choices))
+        .order_by(models.Questions.id)
+    ).all()
+
+# Letters and digits; punctuation and "_" separate words, as in the FTS5 unicode61 tokenizer
+SEARCH_TERM = re.compile(r'[^\W_]+')
+
+def search_terms(q: str) -> List[str]:
+    return SEARCH_TERM.findall(q)
+
+def search_condition(db: Session, q: str):
+    """Full-text match on question_text using the dialect's index; `q` must have search_terms()"""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return models.question_search_vector().op('@@')(func.plainto_tsquery(models.FTS_CONFIG, q))
+    if dialect == 'sqlite':
+        # Quote every term so FTS5 query syntax in user input is matched literally
+        terms = ' '.join(f'"{term}"' for term in search_terms(q))
+        matches = (select(literal_column('rowid')).select_from(table('questions_fts'))
+                   .where(text('questions_fts MATCH :fts_query').bindparams(fts_query=terms)))
+        return models.Questions.id.in_(matches)
+    return models.Questions.question_text.ilike(f'%{q}%')
+
+def select_questions_page(db: Session, after: Optional[int], limit: int, q: Optional[str]):
+    """Keyset page: WHERE id > after ORDER BY id LIMIT n walks the primary key index
+    from the cursor, so deep pages cost the same as the first one"""
+    query = select(models.Questions).options(selectinload(models.Questions.choices))
+    if after is not None:
+        query = query.where(models.Questions.id > after)
+    if q:
+        query = query.where(search_condition(db, q))
+    return db.scalars(query.order_by(models.Questions.id).limit(limit)).all()
+
+def select_question_with_choices(db: Session, question_id: int) -> Optional[dict]:
+    question = db.scalars(
+        select(models.Questions)
+        .where(models.Questions.id == question_id)
+        .options(selectinload(models.Questions.choices))
+    ).first()
+    return QuestionWithChoices.model_validate(question).model_dump() if question else None
+
+async def load_question(question_id: int) -> Optional[dict]:
+    # Opens its own session so cache hits never check out a connection
+    db = open_session()
+    try:
+        await pool_metrics.checkout(db)
+        return await run_db(db, select_question_with_choices, question_id)
+    finally:
+        await close_session(db)
+
+async def get_question(question_id: int) -> Optional[dict]:
+    """Question with its choices, through the cache when enabled"""
+    if question_cache is None:
+        return await load_question(question_id)
+    return await question_cache.get_or_load(question_id, load_question)
+
+@app.get('/questions/', response_model=List[QuestionWithChoices])
+async def read_questions_with_choices(db: db_dependency, ids: Optional[List[int]] = Query(None),
+                                      after: Optional[int] = None, limit: int = Query(50, ge=1, le=MAX_QUESTION_IDS),
+                                      q: Optional[str] = None):
+    """List questions with their choices embedded.
+
+    - `?ids=1&ids=2` fetches specific questions
+    - otherwise pages by id: pass the last id seen as `after` for the next page
+    - `q` filters with full-text search (PostgreSQL tsvector / SQLite FTS5)
+
+    Choices are eager-loaded with selectinload, so each call is two queries no
+    matter how many questions it returns (instead of one /choices call per question).
+    """
+    if ids is not None:
+        if len(ids) > MAX_QUESTION_IDS:
+            raise HTTPException(status_code=422, detail=f'At most {MAX_QUESTION_IDS} ids per request')
+        return await run_db(db, select_questions_with_choices, ids)
+    # A blank q means no filter; one with only punctuation cannot match anything
+    q = q.strip() if q else None
+    if q and not search_terms(q):
+        raise HTTPException(status_code=422, detail='q has no searchable terms')
+    return await run_db(db, select_questions_page, after, limit, q)
+
+@app.get('/questions/{question_id}', response_model=QuestionOut)
+async def read_questions(question_id: int):
     """Get a specific question by ID"""
-    result = db.query(models.Questions).filter(models.Questions.id == question_id).first()
+    result = await get_question(question_id)
     if not result:
         raise HTTPException(status_code=404, detail='Question is not found!')
     return result
 
-@app.get('/choices/{question_id}')
-def read_choices(question_id: int, db: db_dependency):
+@app.get('/choices/{question_id}', response_model=List[ChoiceOut])
+async def read_choices(question_id: int):
     """Get all choices for a specific question"""
-    result = db.query(models.Choices).filter(models.Choices.question_id == question_id).all()
-    if not result:
+    question = await get_question(question_id)
+    if not question or not question['choices']:
         raise HTTPException(status_code=404, detail='Choices is not found!')
-    return result
+    return question['choices']
+
+@app.get('/metrics/cache')
+def cache_metrics():
+    """Hit/miss counters of the question cache in this worker"""
+    if question_cache is None:
+        return {'enabled': False}
+    return {'enabled': True, **question_cache.stats()}
+
+@app.get('/metrics/pool')
+def pool_stats():
+    """Connection pool occupancy and checkout wait times"""
+    return pool_metrics.snapshot()
 
 if __name__ == "__main__":
     import uvicorn
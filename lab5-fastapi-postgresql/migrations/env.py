@@ -0,0 +1,41 @@
+"""Alembic environment: runs revisions against DATABASE_URL.
+
+    alembic upgrade head              # apply all revisions
+    alembic upgrade head --sql        # print the SQL instead (review / run by hand)
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+import models
+from database import URL_DATABASE
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = models.Base.metadata
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # SQLite FTS5 shadow tables are managed by the migrations, not the models
+    return not (type_ == 'table' and name.startswith('questions_fts'))
+
+def run_migrations_offline():
+    context.configure(url=URL_DATABASE, target_metadata=target_metadata, literal_binds=True,
+                      include_object=include_object, render_as_batch=URL_DATABASE.startswith('sqlite'))
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    engine = create_engine(URL_DATABASE, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object,
+                          render_as_batch=connection.dialect.name == 'sqlite')
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
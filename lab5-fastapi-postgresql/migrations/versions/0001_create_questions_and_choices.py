@@ -0,0 +1,42 @@
+"""Create questions and choices
+
+The schema as create_all used to build it. Databases created that way can
+be adopted with `alembic stamp 0001` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'questions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('question_text', sa.String()),
+    )
+    op.create_index('ix_questions_id', 'questions', ['id'])
+    op.create_index('ix_questions_question_text', 'questions', ['question_text'])
+
+    op.create_table(
+        'choices',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('choice_text', sa.String()),
+        sa.Column('is_correct', sa.Boolean()),
+        sa.Column('question_id', sa.Integer(), sa.ForeignKey('questions.id')),
+    )
+    op.create_index('ix_choices_id', 'choices', ['id'])
+    op.create_index('ix_choices_choice_text', 'choices', ['choice_text'])
+
+
+def downgrade():
+    op.drop_table('choices')
+    op.drop_table('questions')
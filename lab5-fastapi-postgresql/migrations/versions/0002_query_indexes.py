@@ -0,0 +1,77 @@
+"""Indexes for choice lookups and full-text search
+
+- ix_choices_question_id: every choices read filters on question_id
+- full-text search on question_text: GIN over to_tsvector in PostgreSQL,
+  an FTS5 table kept in sync by triggers in SQLite
+- drop the B-tree indexes on question_text and choice_text, which no query uses
+
+PostgreSQL indexes are built CONCURRENTLY outside a transaction, so this can
+run against a live database while the API keeps serving.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN "
+    "INSERT INTO questions_fts(rowid, question_text) VALUES (new.id, new.question_text); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, question_text) VALUES ('delete', old.id, old.question_text); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_update AFTER UPDATE ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, question_text) VALUES ('delete', old.id, old.question_text); "
+    "INSERT INTO questions_fts(rowid, question_text) VALUES (new.id, new.question_text); END",
+]
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index('ix_choices_question_id', 'choices', ['question_id'],
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.create_index('ix_questions_question_text_fts', 'questions',
+                            [sa.text("to_tsvector('english', question_text)")],
+                            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('ix_questions_question_text', 'questions', postgresql_concurrently=True, if_exists=True)
+            op.drop_index('ix_choices_choice_text', 'choices', postgresql_concurrently=True, if_exists=True)
+        return
+
+    op.create_index('ix_choices_question_id', 'choices', ['question_id'], if_not_exists=True)
+    op.drop_index('ix_questions_question_text', 'questions', if_exists=True)
+    op.drop_index('ix_choices_choice_text', 'choices', if_exists=True)
+    if dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts "
+                   "USING fts5(question_text, content='questions', content_rowid='id')")
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+        # Index the rows that existed before the triggers
+        op.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_choices_choice_text', 'choices', ['choice_text'], postgresql_concurrently=True)
+            op.create_index('ix_questions_question_text', 'questions', ['question_text'], postgresql_concurrently=True)
+            op.drop_index('ix_questions_question_text_fts', 'questions', postgresql_concurrently=True)
+            op.drop_index('ix_choices_question_id', 'choices', postgresql_concurrently=True)
+        return
+
+    if dialect == 'sqlite':
+        for trigger in ('questions_fts_insert', 'questions_fts_delete', 'questions_fts_update'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS questions_fts')
+    op.create_index('ix_choices_choice_text', 'choices', ['choice_text'])
+    op.create_index('ix_questions_question_text', 'questions', ['question_text'])
+    op.drop_index('ix_choices_question_id', 'choices')
@@ -1,16 +1,40 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, func, literal_column
+from sqlalchemy.dialects import postgresql  # noqa: F401 - registers to_tsvector() for the FTS index
+from sqlalchemy.orm import relationship
 from database import Base
 
+# Text search configuration shared by the PostgreSQL index and queries
+FTS_CONFIG = literal_column("'english'")
+
 class Questions(Base):
     __tablename__ = 'questions'
 
     id = Column(Integer, primary_key=True, index=True)
-    question_text = Column(String, index=True)
+    # Searched through the full-text index below rather than a B-tree
+    question_text = Column(String)
+
+    choices = relationship('Choices', back_populates='question', order_by='Choices.id')
+
+    __table_args__ = (
+        # PostgreSQL: GIN index over to_tsvector('english', question_text)
+        Index('ix_questions_question_text_fts', func.to_tsvector(FTS_CONFIG, question_text),
+              postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
 
 class Choices(Base):
     __tablename__ = 'choices'
 
     id = Column(Integer, primary_key=True, index=True)
-    choice_text = Column(String, index=True)
+    choice_text = Column(String)
     is_correct = Column(Boolean, default=False)
-    question_id = Column(Integer, ForeignKey("questions.id"))
\ No newline at end of file
+    # Every choice read filters on question_id
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True)
+
+    question = relationship('Questions', back_populates='choices')
+
+def question_search_vector():
+    """Same expression as ix_questions_question_text_fts, so the planner can use the index"""
+    return func.to_tsvector(FTS_CONFIG, Questions.question_text)
+
+# SQLite searches a questions_fts FTS5 table instead; it is created by the
+# 0002 migration, together with the triggers that keep it in sync
@@ -0,0 +1,157 @@
+"""Read-through cache of questions with their choices, keyed by question id.
+
+Two backends share the same async get/set/delete/clear interface:
+- LRUBackend: in-process OrderedDict with TTL (default)
+- RedisBackend: any Redis-compatible server, shared by every worker
+
+Values are the JSON of a question with its choices embedded ("null" for an id
+that does not exist, kept for a shorter TTL). Writers call invalidate() after
+commit. Concurrent misses for the same id wait on a single load.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+class LRUBackend:
+    """In-process LRU with per-entry expiry; used from the event loop only"""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, keys: Iterable[str]):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self):
+        self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+class RedisBackend:
+    """Redis (or Valkey, KeyDB, ...) shared by all workers; needs `pip install redis`"""
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', ttl: float = 300.0, prefix: str = 'quiz:question:'):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise ImportError('QUESTION_CACHE=redis requires the redis package: pip install redis') from exc
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        await self.client.set(self.prefix + key, value, px=int((self.ttl if ttl is None else ttl) * 1000))
+
+    async def delete(self, keys: Iterable[str]):
+        names = [self.prefix + key for key in keys]
+        if names:
+            await self.client.delete(*names)
+
+    async def clear(self):
+        async for name in self.client.scan_iter(match=self.prefix + '*'):
+            await self.client.delete(name)
+
+    def size(self) -> Optional[int]:
+        return None
+
+BACKENDS = {'lru': LRUBackend, 'redis': RedisBackend}
+
+MISSING = 'null'
+
+class QuestionCache:
+    """Read-through front end over a backend, with hit/miss counters"""
+
+    def __init__(self, backend, miss_ttl: float = 5.0):
+        self.backend = backend
+        self.miss_ttl = miss_ttl
+        self._loading: Dict[int, asyncio.Future] = {}
+        # Bumped by invalidate(); a load that started before it is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, question_id: int, load: Callable[[int], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """Cached question dict, or `await load(question_id)` on a miss (None if it does not exist)"""
+        value = await self.backend.get(str(question_id))
+        if value is not None:
+            self.hits += 1
+            return json.loads(value)
+        self.misses += 1
+
+        pending = self._loading.get(question_id)
+        if pending is not None:
+            # Someone is already loading this id: share their result
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[question_id] = future
+        generation = self._generation
+        try:
+            self.loads += 1
+            question = await load(question_id)
+            if generation == self._generation:
+                if question is None:
+                    await self.backend.set(str(question_id), MISSING, ttl=self.miss_ttl)
+                else:
+                    await self.backend.set(str(question_id), json.dumps(question))
+            future.set_result(question)
+            return question
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an exception nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self._loading[question_id]
+
+    async def invalidate(self, question_ids: Iterable[int]):
+        """Drop cached entries (including cached "not found") after a committed write"""
+        self._generation += 1
+        self.invalidations += 1
+        await self.backend.delete(str(question_id) for question_id in question_ids)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'invalidations': self.invalidations,
+        }
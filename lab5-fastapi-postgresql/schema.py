@@ -0,0 +1,51 @@
+"""Startup check that the database is at the migration head.
+
+The schema itself is managed by Alembic (alembic.ini, migrations/); workers
+never create or alter tables, they only compare alembic_version with the
+newest revision on disk.
+"""
+import os
+from typing import Optional
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.exc import OperationalError
+
+from database import async_engine, engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini')
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+def expected_revision() -> Optional[str]:
+    """Head revision of migrations/ (read from disk, no database access)"""
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+
+def current_revision(connection) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+async def database_revision() -> Optional[str]:
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            return await connection.run_sync(current_revision)
+    with engine.connect() as connection:
+        return current_revision(connection)
+
+async def verify_schema():
+    """Raise SchemaVersionError if the database is not at head.
+
+    An unreachable database only prints a warning: the pool connects on
+    the first request, so a brief outage does not stop the worker starting.
+    """
+    expected = expected_revision()
+    try:
+        current = await database_revision()
+    except OperationalError as exc:
+        print(f'⚠️  Schema check skipped, database unreachable: {exc.orig}')
+        return
+    if current != expected:
+        raise SchemaVersionError(
+            f'Database schema is at revision {current}, expected {expected}. '
+            'Run `alembic upgrade head` in lab5-fastapi-postgresql first.')
@@ -0,0 +1,320 @@
+"""Crawl several months of HN "Who is hiring?" threads into SQLite.
+
+    python crawler.py --months 6                  # live, rate limited
+    python crawler.py --offline                   # recorded pages in fixtures/
+    python crawler.py --offline --recheck-all     # incremental re-run
+
+1. Discover: walk the whoishiring account's submissions, following "More",
+   until --months hiring threads are found (or take --thread ids).
+2. Crawl: threads are fetched concurrently (--concurrency), each following its
+   own "More" links page by page. Every request goes through lab2's
+   HTTPClient: pooled connections, retries with backoff, per-host rate limit.
+3. Store: each page's top-level comments are written as soon as it is
+   parsed, keyed by comment id, so an interrupted crawl keeps its pages and a
+   comment that moves to another page mid-crawl is stored once.
+4. Re-run: a thread crawled before is checked through the HN API instead:
+   one request for its `kids`, then only the comments not stored yet.
+   Threads older than --settle-days are final and cost no requests.
+
+Finally prints each month's share of posts per keyword and saves it as CSV.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import pandas as pd
+import requests
+from requests.adapters import BaseAdapter
+
+from keywords import DEFAULT_TERMS, KeywordMatcher, count_keywords
+from parsers import (Comment, Submission, extract_submissions, extract_top_level_comments, html_to_text,
+                     next_page_href)
+
+# Shared HTTP client (lab2-requests/http_client.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lab2-requests'))
+from http_client import HTTPClient
+
+HN_URL = 'https://news.ycombinator.com/'
+API_URL = 'https://hacker-news.firebaseio.com/v0/'
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+HIRING_TITLE = 'Ask HN: Who is hiring?'
+USER_AGENT = 'python-labs-hn-crawler/1.0 (course project; low request rate)'
+# Requests per second when live; HN asks crawlers to go slowly
+DEFAULT_RATE = 1.0
+API_RATE = 10.0
+
+class FixtureAdapter(BaseAdapter):
+    """Serves news.ycombinator.com and HN API URLs from recorded files (see fixtures/generate_fixtures.py)"""
+
+    def __init__(self, directory: str = FIXTURES_DIR):
+        super().__init__()
+        self.directory = directory
+        with open(os.path.join(directory, 'api_items.json'), encoding='utf-8') as f:
+            self.api_items = json.load(f)
+
+    def _body(self, url: str) -> Optional[bytes]:
+        parts = urlsplit(url)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if parts.netloc == urlsplit(API_URL).netloc:
+            match = re.fullmatch(r'/v0/item/(\d+)\.json', parts.path)
+            item = self.api_items.get(match.group(1)) if match else None
+            # The real API answers unknown ids with "null"
+            return json.dumps(item).encode() if match else None
+        if parts.path == '/item' and 'id' in query:
+            page = query.get('p', '1')
+            name = f"item_{query['id']}.html.gz" if page == '1' else f"item_{query['id']}_p{page}.html.gz"
+        elif parts.path == '/submitted' and 'id' in query:
+            name = f"submitted_{query['id']}_{query['next']}.html.gz" if 'next' in query else f"submitted_{query['id']}.html.gz"
+        else:
+            return None
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    def send(self, request, **kwargs) -> requests.Response:
+        body = self._body(request.url)
+        response = requests.Response()
+        response.status_code = 200 if body is not None else 404
+        response.reason = 'OK' if body is not None else 'Not Found'
+        response._content = body if body is not None else b''
+        response.headers['Content-Type'] = 'application/json' if '.json' in request.url else 'text/html; charset=utf-8'
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+class ThreadReport(NamedTuple):
+    thread_id: int
+    title: str
+    # 'pages' (crawled the HTML), 'api' (checked for new comments) or 'skipped'
+    action: str
+    requests: int
+    new_comments: int
+    total_comments: int
+
+class CommentStore:
+    """SQLite file of threads and their top-level comments; safe to share across threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS threads (
+                id INTEGER PRIMARY KEY, title TEXT NOT NULL, posted TEXT NOT NULL,
+                pages INTEGER NOT NULL DEFAULT 0,
+                crawled INTEGER NOT NULL DEFAULT 0,     -- every page fetched once
+                settled INTEGER NOT NULL DEFAULT 0,     -- old enough that nothing new is expected
+                checked_at REAL);
+            CREATE TABLE IF NOT EXISTS comments (
+                id INTEGER PRIMARY KEY, thread_id INTEGER NOT NULL REFERENCES threads (id),
+                user TEXT NOT NULL, text TEXT NOT NULL,
+                page INTEGER,                           -- NULL when fetched through the API
+                deleted INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS ix_comments_thread_id ON comments (thread_id);
+        ''')
+
+    def thread(self, thread_id: int) -> Optional[dict]:
+        with self._lock:
+            cursor = self._conn.execute('SELECT * FROM threads WHERE id = ?', (thread_id,))
+            row = cursor.fetchone()
+        return dict(zip([column[0] for column in cursor.description], row)) if row else None
+
+    def save_thread(self, submission: Submission, **fields):
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO threads (id, title, posted) VALUES (?, ?, ?)',
+                               (submission.id, submission.title, submission.posted))
+            if fields:
+                assignments = ', '.join(f'{name} = ?' for name in fields)
+                self._conn.execute(f'UPDATE threads SET {assignments} WHERE id = ?', (*fields.values(), submission.id))
+
+    def save_comments(self, thread_id: int, comments: List[Comment], page: Optional[int] = None,
+                      deleted: bool = False) -> int:
+        """Insert comments not stored yet; returns how many were new"""
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO comments (id, thread_id, user, text, page, deleted) VALUES (?, ?, ?, ?, ?, ?)',
+                [(c.id, thread_id, c.user, c.text, page, int(deleted)) for c in comments])
+            self._conn.execute('COMMIT')
+            return self._conn.total_changes - before
+
+    def comment_ids(self, thread_id: int) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT id FROM comments WHERE thread_id = ?', (thread_id,))}
+
+    def count(self, thread_id: int) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM comments WHERE thread_id = ? AND deleted = 0',
+                                      (thread_id,)).fetchone()[0]
+
+    def texts_by_thread(self) -> Dict[Submission, List[str]]:
+        """Live comment texts of every stored thread, oldest thread first"""
+        with self._lock:
+            threads = [Submission(*row) for row in self._conn.execute('SELECT id, title, posted FROM threads ORDER BY posted')]
+            return {t: [row[0] for row in self._conn.execute(
+                'SELECT text FROM comments WHERE thread_id = ? AND deleted = 0 ORDER BY id', (t.id,))]
+                for t in threads}
+
+    def close(self):
+        self._conn.close()
+
+def discover_threads(client: HTTPClient, months: int, account: str = 'whoishiring') -> List[Submission]:
+    """The newest `months` hiring threads from the account's submissions, newest first"""
+    threads, url = [], urljoin(HN_URL, f'submitted?id={account}')
+    while url and len(threads) < months:
+        response = client.get(url)
+        response.raise_for_status()
+        threads += [s for s in extract_submissions(response.content) if s.title.startswith(HIRING_TITLE)]
+        href = next_page_href(response.content)
+        url = urljoin(HN_URL, href) if href else None
+    return threads[:months]
+
+def lookup_thread(client: HTTPClient, thread_id: int) -> Submission:
+    response = client.get(urljoin(API_URL, f'item/{thread_id}.json'))
+    response.raise_for_status()
+    item = response.json() or {}
+    posted = datetime.fromtimestamp(item.get('time', 0), timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    return Submission(thread_id, item.get('title', f'item {thread_id}'), posted)
+
+def crawl_pages(client: HTTPClient, store: CommentStore, thread: Submission, backend: str = 'auto') -> ThreadReport:
+    """Fetch every page of the thread, storing each page's comments as it arrives"""
+    store.save_thread(thread)
+    url, page, new = urljoin(HN_URL, f'item?id={thread.id}'), 0, 0
+    while url:
+        response = client.get(url)
+        response.raise_for_status()
+        page += 1
+        new += store.save_comments(thread.id, extract_top_level_comments(response.content, backend), page)
+        store.save_thread(thread, pages=page)
+        href = next_page_href(response.content)
+        url = urljoin(HN_URL, href) if href else None
+    store.save_thread(thread, crawled=1, checked_at=time.time())
+    return ThreadReport(thread.id, thread.title, 'pages', page, new, store.count(thread.id))
+
+def check_new_comments(client: HTTPClient, store: CommentStore, thread: Submission) -> ThreadReport:
+    """Ask the API for the thread's top-level ids and fetch only the ones not stored"""
+    response = client.get(urljoin(API_URL, f'item/{thread.id}.json'))
+    response.raise_for_status()
+    known = store.comment_ids(thread.id)
+    missing = [kid for kid in (response.json() or {}).get('kids', []) if kid not in known]
+    new, gone, requests_made = [], [], 1
+    # One request at a time: crawl() already runs `concurrency` threads, and
+    # fetch_many here would start a pool of its own inside each of them
+    for kid in missing:
+        result = client.fetch(urljoin(API_URL, f'item/{kid}.json'))
+        requests_made += result.attempts
+        item = json.loads(result.content) if result.ok else None
+        if not item:
+            continue
+        if item.get('deleted') or item.get('dead'):
+            # Stored as deleted so later runs do not ask for it again
+            gone.append(Comment(item['id'], '', ''))
+        else:
+            new.append(Comment(item['id'], item.get('by', ''), html_to_text(item.get('text', ''))))
+    added = store.save_comments(thread.id, new)
+    store.save_comments(thread.id, gone, deleted=True)
+    store.save_thread(thread, checked_at=time.time())
+    return ThreadReport(thread.id, thread.title, 'api', requests_made, added, store.count(thread.id))
+
+def is_settled(thread: Submission, settle_days: float, now: Optional[float] = None) -> bool:
+    posted = datetime.fromisoformat(thread.posted).replace(tzinfo=timezone.utc).timestamp()
+    return (now or time.time()) - posted > settle_days * 86400
+
+def update_thread(client: HTTPClient, store: CommentStore, thread: Submission, settle_days: float = 40,
+                  recheck_all: bool = False, backend: str = 'auto') -> ThreadReport:
+    state = store.thread(thread.id)
+    if state is not None and state['settled'] and not recheck_all:
+        return ThreadReport(thread.id, thread.title, 'skipped', 0, 0, store.count(thread.id))
+    if state is None or not state['crawled']:
+        report = crawl_pages(client, store, thread, backend)
+    else:
+        report = check_new_comments(client, store, thread)
+    if is_settled(thread, settle_days):
+        store.save_thread(thread, settled=1)
+    return report
+
+def crawl(client: HTTPClient, store: CommentStore, threads: List[Submission], concurrency: int = 4,
+          **options) -> Iterator[ThreadReport]:
+    """update_thread for every thread, `concurrency` at a time, yielding reports as threads finish"""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(update_thread, client, store, thread, **options) for thread in threads]
+        for future in as_completed(futures):
+            yield future.result()
+
+def monthly_keywords(store: CommentStore, matcher: KeywordMatcher) -> pd.DataFrame:
+    """Share of each month's job posts mentioning each term (terms as rows, months as columns)"""
+    columns = {}
+    for thread, texts in store.texts_by_thread().items():
+        month = re.search(r'\(([^)]+)\)\s*$', thread.title)
+        columns[month.group(1) if month else thread.title] = count_keywords(texts, matcher).set_index('term')['share']
+    table = pd.DataFrame(columns).fillna(0.0)
+    if table.empty:
+        return table
+    return table.loc[table.iloc[:, -1].sort_values(ascending=False, kind='stable').index]
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl HN "Who is hiring?" threads into SQLite')
+    parser.add_argument('--months', type=int, default=3, help='newest hiring threads to crawl')
+    parser.add_argument('--thread', type=int, action='append', help='crawl these item ids instead (repeatable)')
+    parser.add_argument('--db', default='hn_jobs.sqlite')
+    parser.add_argument('--concurrency', type=int, default=4, help='threads crawled at the same time')
+    parser.add_argument('--rate', type=float, default=None,
+                        help=f'requests per second to news.ycombinator.com (default {DEFAULT_RATE}, unlimited offline)')
+    parser.add_argument('--settle-days', type=float, default=40,
+                        help='threads older than this are final and not checked again')
+    parser.add_argument('--recheck-all', action='store_true', help='check settled threads for new comments too')
+    parser.add_argument('--offline', action='store_true', help='serve pages from fixtures/ instead of the network')
+    parser.add_argument('--keywords', default=DEFAULT_TERMS)
+    parser.add_argument('--output', default='hn_monthly_keywords.csv')
+    args = parser.parse_args()
+
+    rate = args.rate if args.rate is not None else (None if args.offline else DEFAULT_RATE)
+    limits = {urlsplit(HN_URL).netloc: rate, urlsplit(API_URL).netloc: None if args.offline else API_RATE}
+    client = HTTPClient(max_concurrency=args.concurrency, host_rate_limits=limits,
+                        headers={'User-Agent': USER_AGENT})
+    if args.offline:
+        fixtures = FixtureAdapter()
+        client.session.mount(HN_URL, fixtures)
+        client.session.mount(API_URL, fixtures)
+    store = CommentStore(args.db)
+
+    start = time.perf_counter()
+    with client:
+        threads = [lookup_thread(client, t) for t in args.thread] if args.thread else discover_threads(client, args.months)
+        print(f'Threads: {len(threads)}')
+        totals = {'requests': 0, 'new_comments': 0}
+        for report in crawl(client, store, threads, args.concurrency, settle_days=args.settle_days,
+                            recheck_all=args.recheck_all):
+            totals['requests'] += report.requests
+            totals['new_comments'] += report.new_comments
+            print(f'{report.title}: {report.action}, {report.requests} requests, '
+                  f'{report.new_comments} new, {report.total_comments} stored')
+    print(f"{totals['requests']} requests, {totals['new_comments']} new comments "
+          f'in {time.perf_counter() - start:.2f}s -> {args.db}')
+
+    table = monthly_keywords(store, KeywordMatcher.from_file(args.keywords))
+    store.close()
+    print(table.head(15).to_string())
+    table.to_csv(args.output)
+    print(f'Saved {args.output}')
+
+if __name__ == '__main__':
+    main()
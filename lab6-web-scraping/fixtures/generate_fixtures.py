@@ -0,0 +1,180 @@
+"""Recorded-page stand-ins for Hacker News "Who is hiring?" threads.
+
+    python fixtures/generate_fixtures.py
+
+Writes gzipped item pages in HN's comment-tree markup (tr.athing.comtr rows,
+td.ind[indent], div.commtext, a.morelink for the next page). The content is
+generated from a fixed seed, so the files are reproducible and offline runs
+and benchmarks always see the same thread.
+
+Files (served by crawler.FixtureAdapter):
+- item_<id>.html.gz, item_<id>_p<n>.html.gz: pages 1..n of a thread
+- submitted_whoishiring.html.gz, submitted_whoishiring_<next>.html.gz:
+  the whoishiring account's listing, two pages
+- api_items.json: HN API items; the threads' `kids` include a few comments
+  posted after the pages were recorded, for incremental re-runs
+"""
+import gzip
+import html
+import json
+import os
+import random
+from datetime import datetime, timezone
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_THREAD_ID = 42919502
+# HN starts a new page after roughly this many top-level comments
+POSTS_PER_PAGE = 80
+# (thread id, month, top-level posts, posts that only the API knows about); newest first
+HIRING_THREADS = [
+    (BENCHMARK_THREAD_ID, 'February 2025', 1000, 4),
+    (42575537, 'January 2025', 230, 2),
+    (42297424, 'December 2024', 170, 0),
+    (42017580, 'November 2024', 120, 0),
+]
+
+COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises',
+             'Pied Piper', 'Vandelay', 'Soylent', 'Tyrell', 'Cyberdyne', 'Aperture', 'Wonka', 'Oscorp']
+ROLES = ['Senior Software Engineer', 'Backend Engineer', 'Full-Stack Developer', 'ML Engineer',
+         'Data Engineer', 'Site Reliability Engineer', 'Frontend Engineer', 'Founding Engineer']
+LOCATIONS = ['REMOTE (US)', 'Remote (EU)', 'ONSITE San Francisco', 'Hybrid, London', 'Berlin', 'NYC or Remote']
+TECH = ['Python', 'JavaScript', 'TypeScript', 'Go', 'Golang', 'C#', 'Java', 'Rust', 'Kotlin', 'React', 'Node.js',
+        'PostgreSQL', 'Kubernetes', 'AWS', 'GCP', 'Django', 'FastAPI', 'C++', 'Ruby on Rails', 'Elixir',
+        'machine learning', 'Terraform', 'Scala', 'Swift', 'PyTorch', 'Next.js', 'Redis', 'Kafka']
+FILLER = ['We are a small, profitable team building tools for', 'Our customers include some of the largest',
+          'You will own features end to end, from design to deployment.', 'We value clear writing and kind reviews.',
+          'Competitive salary, equity and a generous learning budget.', 'Interview process: intro call, take-home,'
+          ' and a conversation with the team.', 'We are growing quickly and hiring across the stack.']
+
+def job_post(rng: random.Random) -> str:
+    """Comment HTML in HN's format: first paragraph bare, then <p> paragraphs"""
+    header = ' | '.join([rng.choice(COMPANIES), rng.choice(ROLES), rng.choice(LOCATIONS), 'Full-time'])
+    stack = ', '.join(rng.sample(TECH, rng.randint(2, 6)))
+    paragraphs = [rng.choice(FILLER) for _ in range(rng.randint(2, 5))]
+    paragraphs.insert(rng.randrange(len(paragraphs) + 1), f'Our stack: {stack}.')
+    link = f'https://example.com/jobs/{rng.randrange(10 ** 6)}'
+    body = ''.join(f'<p>{html.escape(p)}</p>' for p in paragraphs)
+    return (f'{html.escape(header)}{body}<p>Apply: <a href="{link}" rel="nofollow">{link}</a></p>')
+
+def reply(rng: random.Random) -> str:
+    return html.escape(rng.choice(['Is this role open to contractors?', 'What is the salary range?',
+                                   'Do you sponsor visas?', 'Applied, thanks!', 'Is the team fully remote?']))
+
+def comment_row(thread_id: int, comment_id: int, indent: int, user: str, text: str) -> str:
+    return f'''<tr class="athing comtr" id="{comment_id}"><td><table border="0">  <tr>    <td class="ind" indent="{indent}"><img src="s.gif" height="1" width="{indent * 40}"></td><td class="votelinks" valign="top">
+      <center><a id="up_{comment_id}" href="vote?id={comment_id}&amp;how=up&amp;goto=item%3Fid%3D{thread_id}"><div class="votearrow" title="upvote"></div></a></center>    </td><td class="default"><div style="margin-top:2px; margin-bottom:-10px;"><span class="comhead">
+          <a href="user?id={user}" class="hnuser">{user}</a> <span class="age" title="2025-02-03T16:03:11"><a href="item?id={comment_id}">3 days ago</a></span> <span id="unv_{comment_id}"></span>          <span class="navs">
+             | <a class="togg clicky" id="{comment_id}" n="1" href="javascript:void(0)">[&ndash;]</a><span class="onstory"></span>          </span>
+                  </span></div><br><div class="comment">
+                  <div class="commtext c00">{text}</div>
+              <div class="reply">        <p><font size="1">
+                      <u><a href="reply?id={comment_id}&amp;goto=item%3Fid%3D{thread_id}%23{comment_id}" rel="nofollow">reply</a></u>
+                  </font>
+      </div></div></td></tr>
+        </table></td></tr>
+'''
+
+def thread_page(thread_id: int, title: str, rows: list, more_href: str = None) -> str:
+    more = (f'<tr class="morespace" style="height:10px"></tr><tr><td></td><td class="title">'
+            f'<a href="{more_href}" class="morelink" rel="next">More</a></td></tr>') if more_href else ''
+    return f'''<html lang="en" op="item"><head><meta name="referrer" content="origin"><link rel="stylesheet" type="text/css" href="news.css">
+<title>{html.escape(title)} | Hacker News</title></head><body><center><table id="hnmain" border="0" cellpadding="0" cellspacing="0" width="85%" bgcolor="#f6f6ef">
+<tr><td bgcolor="#ff6600"><table border="0" cellpadding="0" cellspacing="0" width="100%" style="padding:2px"><tr><td><span class="pagetop"><b class="hnname"><a href="news">Hacker News</a></b></span></td></tr></table></td></tr>
+<tr id="pagespace" title="{html.escape(title)}" style="height:10px"></tr><tr><td><table class="fatitem" border="0">
+<tr class="athing submission" id="{thread_id}"><td class="title"><span class="titleline"><a href="item?id={thread_id}">{html.escape(title)}</a></span></td></tr>
+<tr><td colspan="2"></td><td><div class="toptext">Please state the location and include REMOTE for remote work. Only post if you are actively hiring.</div></td></tr>
+</table><br>
+<table border="0" class="comment-tree">
+{''.join(rows)}</table>
+{more}</td></tr></table></center></body></html>
+'''
+
+def thread_rows(rng: random.Random, thread_id: int, first_id: int, top_level: int, max_replies: int = 3):
+    """Rows for `top_level` job posts, each followed by up to `max_replies` nested replies.
+
+    Returns one list of rows per job post and the next free comment id.
+    """
+    posts, comment_id = [], first_id
+    for _ in range(top_level):
+        rows = [comment_row(thread_id, comment_id, 0, f'user{rng.randrange(10 ** 5)}', job_post(rng))]
+        comment_id += 1
+        for depth in range(rng.randint(0, max_replies)):
+            rows.append(comment_row(thread_id, comment_id, depth + 1, f'user{rng.randrange(10 ** 5)}', reply(rng)))
+            comment_id += 1
+        posts.append(rows)
+    return posts, comment_id
+
+def submission_rows(rank: int, submission_id: int, title: str, posted: datetime, comments: int) -> str:
+    return f'''<tr class="athing submission" id="{submission_id}"><td align="right" valign="top" class="title"><span class="rank">{rank}.</span></td><td valign="top" class="votelinks"><center><a id="up_{submission_id}" href="vote?id={submission_id}&amp;how=up&amp;goto=submitted%3Fid%3Dwhoishiring"><div class="votearrow" title="upvote"></div></a></center></td><td class="title"><span class="titleline"><a href="item?id={submission_id}">{html.escape(title)}</a></span></td></tr><tr><td colspan="2"></td><td class="subtext"><span class="subline">
+  <span class="score" id="score_{submission_id}">{comments // 2} points</span> by <a href="user?id=whoishiring" class="hnuser">whoishiring</a> <span class="age" title="{posted:%Y-%m-%dT%H:%M:%S} {int(posted.timestamp())}"><a href="item?id={submission_id}">{posted:%B %d, %Y}</a></span> <span id="unv_{submission_id}"></span> | <a href="item?id={submission_id}">{comments}&nbsp;comments</a>        </span>
+      </td></tr>
+      <tr class="spacer" style="height:5px"></tr>
+'''
+
+def listing_page(rows: list, more_href: str = None) -> str:
+    more = (f'<tr class="morespace" style="height:10px"></tr><tr><td colspan="2"></td><td class="title">'
+            f'<a href="{more_href}" class="morelink" rel="next">More</a></td></tr>') if more_href else ''
+    return f'''<html lang="en" op="submitted"><head><meta name="referrer" content="origin"><link rel="stylesheet" type="text/css" href="news.css">
+<title>whoishiring's submissions | Hacker News</title></head><body><center><table id="hnmain" border="0" cellpadding="0" cellspacing="0" width="85%" bgcolor="#f6f6ef">
+<tr id="pagespace" title="whoishiring's submissions" style="height:10px"></tr><tr><td><table border="0" cellpadding="0" cellspacing="0">
+{''.join(rows)}{more}</table>
+</td></tr></table></center></body></html>
+'''
+
+def write_page(name: str, page: str):
+    # mtime=0 keeps the gzip bytes identical between runs
+    with open(os.path.join(FIXTURES_DIR, name), 'wb') as raw, \
+            gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+        f.write(page.encode('utf-8'))
+
+def main():
+    api_items = {}
+    listing = []
+    for thread_id, month, top_level, unrecorded in HIRING_THREADS:
+        # Seeded per thread, so the February page stays the parser benchmark's input
+        rng = random.Random(thread_id)
+        title = f'Ask HN: Who is hiring? ({month})'
+        posts, next_id = thread_rows(rng, thread_id, thread_id + 1, top_level)
+        pages = [posts[i:i + POSTS_PER_PAGE] for i in range(0, len(posts), POSTS_PER_PAGE)]
+        if thread_id == BENCHMARK_THREAD_ID:
+            # One large page for the parser benchmark
+            pages = [posts]
+        for number, page_posts in enumerate(pages, start=1):
+            more = f'item?id={thread_id}&amp;p={number + 1}' if number < len(pages) else None
+            name = f'item_{thread_id}.html.gz' if number == 1 else f'item_{thread_id}_p{number}.html.gz'
+            write_page(name, thread_page(thread_id, title, [row for rows in page_posts for row in rows], more))
+
+        posted = datetime.strptime(f'1 {month} 16:00', '%d %B %Y %H:%M').replace(tzinfo=timezone.utc)
+        kids = [int(rows[0].split('id="', 1)[1].split('"', 1)[0]) for rows in posts]
+        # Comments posted after the pages were recorded, plus one deleted one
+        for offset in range(unrecorded + (1 if unrecorded else 0)):
+            comment_id = next_id + offset
+            kids.insert(0, comment_id)
+            item = {'id': comment_id, 'parent': thread_id, 'type': 'comment',
+                    'time': int(posted.timestamp()) + 20 * 86400 + offset * 3600}
+            if offset < unrecorded:
+                item.update(by=f'user{rng.randrange(10 ** 5)}', text=job_post(rng))
+            else:
+                item['deleted'] = True
+            api_items[comment_id] = item
+        api_items[thread_id] = {'id': thread_id, 'by': 'whoishiring', 'type': 'story', 'title': title,
+                                'time': int(posted.timestamp()), 'descendants': next_id - thread_id - 1,
+                                'kids': kids}
+        listing.append((thread_id, title, posted, next_id - thread_id - 1))
+        for offset, kind in ((1, 'Who wants to be hired?'), (2, 'Freelancer? Seeking Freelancer?')):
+            listing.append((thread_id - offset, f'Ask HN: {kind} ({month})', posted, 300 - 100 * offset))
+
+    # whoishiring's listing, split so the crawler has to follow its "More" link
+    split = 5
+    first, second = listing[:split], listing[split:]
+    write_page('submitted_whoishiring.html.gz', listing_page(
+        [submission_rows(rank, *entry) for rank, entry in enumerate(first, start=1)],
+        f'submitted?id=whoishiring&amp;next={second[0][0]}&amp;n={split + 1}'))
+    write_page(f'submitted_whoishiring_{second[0][0]}.html.gz', listing_page(
+        [submission_rows(rank, *entry) for rank, entry in enumerate(second, start=split + 1)]))
+    with open(os.path.join(FIXTURES_DIR, 'api_items.json'), 'w', encoding='utf-8') as f:
+        json.dump({str(key): value for key, value in sorted(api_items.items())}, f, indent=1)
+    print(f'Wrote fixtures to {FIXTURES_DIR}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Counting dictionary terms across job posts.
+
+    matcher = KeywordMatcher.from_file('keywords.txt')       # compiled once
+    table = count_keywords(texts, matcher)                   # pandas DataFrame
+    table.to_csv('keyword_counts.csv', index=False)
+
+Terms can be several words ("machine learning") or contain symbols ("c#",
+"c++", "node.js"); matching ignores case and runs of whitespace and only
+accepts whole tokens, so "go" does not match "good" and "java" does not
+match "javascript". Each term may carry aliases that count towards one name.
+
+Engines:
+- regex: every alias in one pattern shaped like a prefix trie (always available)
+- aho-corasick: pyahocorasick automaton (`pip install pyahocorasick`),
+  which stays linear in the text for dictionaries of many thousands of terms
+
+Both find the same leftmost-longest, non-overlapping matches. Large inputs
+are split across worker processes, each compiling the matcher once.
+"""
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+DEFAULT_TERMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keywords.txt')
+# Below this many posts, starting processes costs more than it saves
+PARALLEL_THRESHOLD = 2000
+CHUNK_SIZE = 500
+
+def normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+def load_terms(path: str) -> Dict[str, List[str]]:
+    """{name: [aliases]} from lines of "Name" or "Name: alias, alias"; # starts a comment"""
+    terms = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, sep, aliases = line.partition(': ')
+            terms[name] = [a.strip() for a in aliases.split(',') if a.strip()] if sep else [name]
+    return terms
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """One regex for all `words`, nested by shared prefix.
+
+    A flat "a|b|c" alternation retries every word at every position; the
+    trie shape only follows prefixes that are actually present. Greedy
+    optional groups prefer the longest word, and backtrack to a shorter one
+    when the longer one is not followed by a token boundary.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def compile_node(node: dict) -> str:
+        branches = [re.escape(char) + compile_node(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return compile_node(trie)
+
+def is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+class KeywordMatcher:
+    def __init__(self, terms: Dict[str, Sequence[str]], engine: str = 'auto'):
+        self.terms = {name: list(aliases) for name, aliases in terms.items()}
+        # normalized alias -> name; the first name to claim an alias keeps it
+        self.aliases: Dict[str, str] = {}
+        for name, aliases in self.terms.items():
+            for alias in aliases:
+                self.aliases.setdefault(normalize(alias), name)
+        if engine == 'auto':
+            engine = 'aho-corasick' if ahocorasick_available() else 'regex'
+        self.engine = engine
+        if engine == 'regex':
+            self._pattern = re.compile(rf'(?<!\w){trie_pattern(self.aliases)}(?!\w)')
+        elif engine == 'aho-corasick':
+            import ahocorasick
+            self._automaton = ahocorasick.Automaton()
+            for alias in self.aliases:
+                self._automaton.add_word(alias, len(alias))
+            self._automaton.make_automaton()
+        else:
+            raise ValueError(f'unknown engine {engine!r}')
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_TERMS, engine: str = 'auto') -> 'KeywordMatcher':
+        return cls(load_terms(path), engine)
+
+    def find(self, text: str) -> List[str]:
+        """Names of every term mentioned in `text`, once per mention"""
+        text = normalize(text)
+        if self.engine == 'regex':
+            return [self.aliases[m] for m in self._pattern.findall(text)]
+        return [self.aliases[text[start:end]] for start, end in self._aho_spans(text)]
+
+    def _aho_spans(self, text: str) -> List[Tuple[int, int]]:
+        # All whole-token matches, then leftmost-longest without overlaps (what the regex does)
+        candidates = []
+        for last, length in self._automaton.iter(text):
+            start, end = last - length + 1, last + 1
+            if (start == 0 or not is_word(text[start - 1])) and (end == len(text) or not is_word(text[end])):
+                candidates.append((start, -length))
+        spans, position = [], 0
+        for start, negative_length in sorted(candidates):
+            if start >= position:
+                position = start - negative_length
+                spans.append((start, position))
+        return spans
+
+    def count(self, texts: Iterable[str]) -> Tuple[Counter, Counter]:
+        """(posts mentioning each term, total mentions of each term)"""
+        posts, mentions = Counter(), Counter()
+        for text in texts:
+            found = self.find(text)
+            mentions.update(found)
+            posts.update(set(found))
+        return posts, mentions
+
+def ahocorasick_available() -> bool:
+    try:
+        import ahocorasick  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+_worker_matcher: Optional[KeywordMatcher] = None
+
+def _init_worker(terms: Dict[str, List[str]], engine: str):
+    global _worker_matcher
+    _worker_matcher = KeywordMatcher(terms, engine)
+
+def _count_chunk(texts: List[str]) -> Tuple[Counter, Counter]:
+    return _worker_matcher.count(texts)
+
+def count_parallel(texts: Sequence[str], matcher: KeywordMatcher, processes: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE) -> Tuple[Counter, Counter]:
+    """KeywordMatcher.count split over a process pool; workers build their own matcher once"""
+    posts, mentions = Counter(), Counter()
+    chunks = [list(texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(matcher.terms, matcher.engine)) as pool:
+        for chunk_posts, chunk_mentions in pool.map(_count_chunk, chunks):
+            posts.update(chunk_posts)
+            mentions.update(chunk_mentions)
+    return posts, mentions
+
+def count_keywords(texts: Sequence[str], matcher: Optional[KeywordMatcher] = None,
+                   processes: Optional[int] = None) -> pd.DataFrame:
+    """One row per dictionary term: posts mentioning it, total mentions and share of posts.
+
+    Runs in this process for small inputs (or processes=1) and in a process
+    pool once there are PARALLEL_THRESHOLD posts or more.
+    """
+    matcher = matcher or KeywordMatcher.from_file()
+    if processes == 1 or len(texts) < PARALLEL_THRESHOLD:
+        posts, mentions = matcher.count(texts)
+    else:
+        posts, mentions = count_parallel(texts, matcher, processes)
+    table = pd.DataFrame({
+        'term': list(matcher.terms),
+        'posts': [posts[name] for name in matcher.terms],
+        'mentions': [mentions[name] for name in matcher.terms],
+    })
+    table['share'] = (table['posts'] / len(texts)).round(4) if len(texts) else 0.0
+    return table.sort_values(['posts', 'mentions'], ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,132 @@
+"""Top-level comment extraction from Hacker News item pages.
+
+    comments = extract_top_level_comments(response.content)            # fastest available backend
+    comments = extract_top_level_comments(html, backend='bs4')          # BeautifulSoup fallback
+
+Every backend makes one pass over the comment rows (tr.comtr), keeps those
+whose td.ind has indent="0", and reads the text of their div.commtext once.
+Text nodes are joined with newlines so paragraphs and links do not run
+together ("GoWe are hiring").
+
+Backends, fastest first:
+- selectolax: lexbor C parser (`pip install selectolax`)
+- lxml: libxml2 HTML parser
+- bs4: BeautifulSoup with the pure-Python html.parser (always available)
+
+Small helpers for the crawler read the "More" link of a page, the
+submissions on a user's listing page and the HTML text of API items.
+"""
+import html as htmllib
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+class Comment(NamedTuple):
+    id: int
+    user: str
+    text: str
+
+class Submission(NamedTuple):
+    id: int
+    title: str
+    # ISO timestamp from the age tooltip, e.g. "2025-02-03T16:00:15"
+    posted: str
+
+Html = Union[bytes, str]
+
+def extract_with_selectolax(html: Html) -> List[Comment]:
+    from selectolax.lexbor import LexborHTMLParser
+    comments = []
+    for row in LexborHTMLParser(html).css('tr.comtr'):
+        ind = row.css_first('td.ind')
+        if ind is None or ind.attributes.get('indent') != '0':
+            continue
+        body = row.css_first('div.commtext')
+        user = row.css_first('a.hnuser')
+        comments.append(Comment(
+            int(row.attributes['id']),
+            user.text() if user is not None else '',
+            body.text(separator='\n').strip() if body is not None else '',
+        ))
+    return comments
+
+def extract_with_lxml(html: Html) -> List[Comment]:
+    import lxml.html
+    comments = []
+    for row in lxml.html.fromstring(html).find_class('comtr'):
+        ind = row.find_class('ind')
+        if not ind or ind[0].get('indent') != '0':
+            continue
+        body = row.find_class('commtext')
+        user = row.find_class('hnuser')
+        comments.append(Comment(
+            int(row.get('id')),
+            user[0].text_content() if user else '',
+            '\n'.join(body[0].itertext()).strip() if body else '',
+        ))
+    return comments
+
+def extract_with_bs4(html: Html, features: str = 'html.parser') -> List[Comment]:
+    from bs4 import BeautifulSoup
+    comments = []
+    for row in BeautifulSoup(html, features).select('tr.comtr'):
+        ind = row.find('td', class_='ind')
+        if ind is None or ind.get('indent') != '0':
+            continue
+        body = row.find('div', class_='commtext')
+        user = row.find('a', class_='hnuser')
+        comments.append(Comment(
+            int(row['id']),
+            user.get_text() if user is not None else '',
+            body.get_text('\n').strip() if body is not None else '',
+        ))
+    return comments
+
+BACKENDS: Dict[str, Callable[[Html], List[Comment]]] = {
+    'selectolax': extract_with_selectolax,
+    'lxml': extract_with_lxml,
+    'bs4': extract_with_bs4,
+}
+
+def available_backends() -> List[str]:
+    names = []
+    for name, module in (('selectolax', 'selectolax.lexbor'), ('lxml', 'lxml.html'), ('bs4', 'bs4')):
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+def extract_top_level_comments(html: Html, backend: str = 'auto') -> List[Comment]:
+    """Top-level comments (job posts) of an HN item page, in page order"""
+    if backend == 'auto':
+        backend = available_backends()[0]
+    return BACKENDS[backend](html)
+
+# HN renders the next-page link as <a href="item?id=1&amp;p=2" class="morelink" rel="next">
+MORELINK = re.compile(rb'<a href="([^"]*)" class="morelink"')
+
+def next_page_href(html: Html) -> Optional[str]:
+    """Relative href of the page's "More" link, or None on the last page"""
+    match = MORELINK.search(html.encode() if isinstance(html, str) else html)
+    return htmllib.unescape(match.group(1).decode()) if match else None
+
+def extract_submissions(html: Html) -> List[Submission]:
+    """Stories on a listing page (front page, submitted?id=...), in page order"""
+    from bs4 import BeautifulSoup
+    submissions = []
+    for row in BeautifulSoup(html, 'html.parser').select('tr.athing.submission'):
+        link = row.select_one('span.titleline > a')
+        subtext = row.find_next_sibling('tr')
+        age = subtext.select_one('span.age') if subtext is not None else None
+        submissions.append(Submission(
+            int(row['id']),
+            link.get_text() if link is not None else '',
+            age['title'].split()[0] if age is not None and age.get('title') else '',
+        ))
+    return submissions
+
+def html_to_text(fragment: str) -> str:
+    """Plain text of an HTML comment body, paragraphs on separate lines as in the page extractors"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(fragment, 'html.parser').get_text('\n').strip()
@@ -1,76 +1,65 @@
-import requests
-from bs4 import BeautifulSoup
+import os
+import sys
+import matplotlib
+matplotlib.use("Agg")  # write the chart to a file, never block on a window
 import matplotlib.pyplot as plt
+from keywords import DEFAULT_TERMS, KeywordMatcher, count_keywords
+from parsers import extract_top_level_comments
+
+# Shared on-disk HTTP cache (lab2-requests/http_cache.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lab2-requests'))
+from http_cache import CachedSession
+
+# selectolax, lxml or bs4 (pure Python); "auto" picks the fastest installed
+PARSER_BACKEND = os.getenv("HN_PARSER", "auto")
+# Term dictionary ("Name: alias, alias" per line) and where the results go
+KEYWORDS_FILE = os.getenv("HN_KEYWORDS", DEFAULT_TERMS)
+OUTPUT_CSV = os.getenv("HN_OUTPUT", "keyword_counts.csv")
+OUTPUT_CHART = os.path.splitext(OUTPUT_CSV)[0] + ".png"
 
 def main():
     print('Hello world!')
     
     url = "https://news.ycombinator.com/item?id=42919502"
-    response = requests.get(url)
+    # Re-runs read the thread from the on-disk cache while it is fresh
+    session = CachedSession()
+    response = session.get(url, timeout=10)
     print(f"Scraping: {url}")
-    print(response)
-    print(response.content)
+    print(response, f"({response.from_cache})")
+    print(session.cache.stats())
+    print(f"Page size: {len(response.content):,} bytes")
 
-    soup = BeautifulSoup(response.content, "html.parser")
-    elements = soup.find_all(class_="comment")
-
-    print(f"Elements: {len(elements)}")
-    
-    # find all elements with class="ind" and indent level = 0
-    elements = soup.find_all(class_="ind" , indent=0)
-    # for each of this elements, find the next element
-    comments = [e.find_next(class_="comment") for e in elements]
+    # One pass over the comment rows: keep those with indent level = 0
+    # (top-level job posts) and read each one's text once
+    comments = extract_top_level_comments(response.content, backend=PARSER_BACKEND)
 
     # Show the number of comments found
-    print(f"Comments: {len(comments)}")   
-
-    # show each comment (job post)
-    for comment in comments:
-        print(comment)
-
-    # show each comment (job post) | Clean up the response text
-    for comment in comments:
-        comment_text = comment.get_text()
-        print(comment_text, end="\n\n")
-    
-    # Map of technologies keyword to search for
-    # and the occurence initialized at 0
-    keywords = {"python": 0, "javascript": 0, "typescript": 0, "go": 0, "c#": 0, "java": 0, "rust": 0 }
+    print(f"Comments: {len(comments)}")
 
     # show each comment (job post)
     for comment in comments:
-        # get the comment text and lower case it
-        comment_text = comment.get_text().lower()
-
-        # split comment by space which create an array of words
-        words = comment_text.split(" ")
-
-        print(words)
+        print(f"[{comment.id}] {comment.user}", comment.text, sep="\n", end="\n\n")
 
-        # Use the string strip function
-        # and place all the caracters we want to strip away
-        words = [w.strip(".,/:;!@") for w in words]
-        print(words)
+    # Count every dictionary term over all posts in one pass
+    # (multi-word and symbol terms included, see keywords.txt)
+    matcher = KeywordMatcher.from_file(KEYWORDS_FILE)
+    table = count_keywords([comment.text for comment in comments], matcher)
+    print(f"Keyword engine: {matcher.engine} ({len(matcher.aliases)} terms)")
+    print(table.to_string(index=False))
+    table.to_csv(OUTPUT_CSV, index=False)
+    print(f"Saved {OUTPUT_CSV}")
 
-        # Use the string strip function
-        # and place all the caracters we want to strip away
-        # Use a set to have unique words
-        words = {w.strip(".,/:;!@") for w in words}
-        print(words)
-    
-        # search for k in keywords, this give you the dictionory key
-        # if the key is in the words set, we add 1 to the keywords score
-        for k in keywords:
-            if k in words:
-                keywords[k] += 1
-        print(keywords)
-
-    # plot a bar graph
-    plt.bar(keywords.keys(), keywords.values())
+    # plot a bar graph of the most mentioned terms, saved instead of shown
+    top = table.head(15)
+    plt.figure(figsize=(10, 5))
+    plt.bar(top["term"], top["posts"])
     # Add labels
-    plt.xlabel("Language")
-    plt.ylabel("# of Mentions")
-    plt.show()
-    
+    plt.xlabel("Technology")
+    plt.ylabel("# of Job Posts")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.savefig(OUTPUT_CHART)
+    print(f"Saved {OUTPUT_CHART}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""Memory- and latency-aware concurrency for the crawl scheduler.
+
+    controller = ConcurrencyController(scheduler, memory_limit_mb=2048, latency_target=5.0,
+                                       page_count=probe.page_count, recycle=probe.recycle)
+    await controller.start()
+    async for outcome in scheduler.run(urls):
+        controller.observe(outcome)
+    await controller.stop()          # writes the decision log (CSV)
+
+Every `interval` seconds the controller samples the RSS of this process and
+its children (the Playwright driver and the browser), the number of open
+browser pages, and the median time of recent crawls. It then:
+
+- memory at or above `memory_limit_mb`: halves the slots (multiplicative decrease)
+- latency above `latency_target`: removes one slot
+- memory below `memory_target` of the limit, work queued, latency fine:
+  adds one slot (additive increase), up to `max_concurrent`
+- more open pages than crawls in flight (pages that were never closed), or
+  `recycle_every` pages crawled since the last recycle: drains the in-flight
+  crawls and calls `recycle()` to close the browser contexts
+
+Each sample and decision is appended to `history` and written as a time
+series to `log_path`.
+"""
+import asyncio
+import csv
+import os
+import statistics
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+import psutil
+
+from scheduler import CrawlOutcome, CrawlScheduler
+
+LOG_FIELDS = ['t', 'rss_mb', 'browser_pages', 'in_flight', 'queued', 'latency_p50', 'slots_before',
+              'slots_after', 'action', 'reason']
+
+def tree_rss(process: psutil.Process) -> int:
+    """RSS in bytes of a process and all of its descendants"""
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total
+
+class ConcurrencyController:
+    def __init__(self, scheduler: CrawlScheduler, min_concurrent: int = 1, max_concurrent: int = 20,
+                 memory_limit_mb: float = 2048, memory_target: float = 0.8, latency_target: Optional[float] = None,
+                 interval: float = 1.0, latency_window: int = 20,
+                 page_count: Optional[Callable[[], int]] = None,
+                 recycle: Optional[Callable[[], Awaitable[None]]] = None,
+                 leaked_pages: int = 5, recycle_every: Optional[int] = 500,
+                 log_path: Optional[str] = 'concurrency_log.csv',
+                 process: Optional[psutil.Process] = None):
+        self.scheduler = scheduler
+        self.min_concurrent = min_concurrent
+        self.max_concurrent = max_concurrent
+        self.memory_limit_mb = memory_limit_mb
+        self.memory_target = memory_target
+        self.latency_target = latency_target
+        self.interval = interval
+        self.page_count = page_count
+        self.recycle = recycle
+        self.leaked_pages = leaked_pages
+        self.recycle_every = recycle_every
+        self.log_path = log_path
+        self.process = process or psutil.Process(os.getpid())
+        self.history: List[dict] = []
+        self.peak_rss_mb = 0.0
+        self._latencies = deque(maxlen=latency_window)
+        self._since_recycle = 0
+        self._started = time.perf_counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def observe(self, outcome: CrawlOutcome):
+        """Feed each finished crawl; its time drives the latency rule"""
+        self._latencies.append(outcome.elapsed)
+        self._since_recycle += 1
+
+    def sample(self) -> dict:
+        rss_mb = tree_rss(self.process) / (1024 * 1024)
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        return {
+            't': round(time.perf_counter() - self._started, 3),
+            'rss_mb': round(rss_mb, 1),
+            'browser_pages': self.page_count() if self.page_count else None,
+            'in_flight': self.scheduler.in_flight,
+            'queued': self.scheduler.queued,
+            'latency_p50': round(statistics.median(self._latencies), 3) if self._latencies else None,
+        }
+
+    def decide(self, sample: dict):
+        """(new slot count, action, reason) for one sample"""
+        slots = self.scheduler.max_concurrent
+        pages, latency = sample['browser_pages'], sample['latency_p50']
+        if self.recycle is not None:
+            if pages is not None and pages - sample['in_flight'] >= self.leaked_pages:
+                return slots, 'recycle', f"{pages - sample['in_flight']} pages open without a crawl"
+            if self.recycle_every and self._since_recycle >= self.recycle_every:
+                return slots, 'recycle', f'{self._since_recycle} pages since last recycle'
+        if sample['rss_mb'] >= self.memory_limit_mb:
+            return max(self.min_concurrent, slots // 2), 'decrease', f"rss {sample['rss_mb']} MB >= limit"
+        if self.latency_target is not None and latency is not None and latency > self.latency_target:
+            return max(self.min_concurrent, slots - 1), 'decrease', f'p50 {latency}s > target'
+        if (sample['rss_mb'] < self.memory_limit_mb * self.memory_target and sample['queued']
+                and sample['in_flight'] >= slots and slots < self.max_concurrent):
+            return slots + 1, 'increase', 'memory headroom and work queued'
+        return slots, 'hold', ''
+
+    async def _recycle(self, slots: int):
+        # Stop starting crawls, let the running ones finish, then close their contexts
+        self.scheduler.resize(0)
+        while self.scheduler.in_flight:
+            await asyncio.sleep(0.05)
+        try:
+            await self.recycle()
+        finally:
+            self._since_recycle = 0
+            self._latencies.clear()
+            self.scheduler.resize(slots)
+
+    async def step(self) -> dict:
+        sample = self.sample()
+        before = self.scheduler.max_concurrent
+        after, action, reason = self.decide(sample)
+        if action == 'recycle':
+            await self._recycle(after)
+        elif after != before:
+            self.scheduler.resize(after)
+        record = dict(sample, slots_before=before, slots_after=after, action=action, reason=reason)
+        self.history.append(record)
+        return record
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            record = await self.step()
+            if record['action'] != 'hold':
+                print(f"[controller] t={record['t']}s rss={record['rss_mb']}MB pages={record['browser_pages']} "
+                      f"slots {record['slots_before']} -> {record['slots_after']} ({record['action']}: {record['reason']})")
+
+    async def start(self):
+        self._started = time.perf_counter()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.log_path:
+            self.write_log(self.log_path)
+
+    def write_log(self, path: str):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=LOG_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.history)
+
+class Crawl4AIProbe:
+    """Page counting and context recycling for an AsyncWebCrawler's Playwright browser.
+
+    Reaches into crawl4ai's BrowserManager (crawler_strategy.browser_manager):
+    contexts it reuses across crawls live in `contexts_by_config` and are
+    recreated on the next arun() after being closed here.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @property
+    def browser_manager(self):
+        return getattr(getattr(self.crawler, 'crawler_strategy', None), 'browser_manager', None)
+
+    def page_count(self) -> int:
+        browser = getattr(self.browser_manager, 'browser', None)
+        if browser is None:
+            return 0
+        return sum(len(context.pages) for context in browser.contexts)
+
+    async def recycle(self):
+        manager = self.browser_manager
+        contexts = getattr(manager, 'contexts_by_config', None)
+        if not contexts:
+            return
+        async with manager._contexts_lock:
+            stale = list(contexts.values())
+            contexts.clear()
+        for context in stale:
+            try:
+                await context.close()
+            except Exception as exc:
+                print(f"[controller] closing context failed: {exc!r}")
@@ -0,0 +1,244 @@
+"""Incremental, resumable crawls: only changed pages are crawled and rewritten.
+
+    async with IncrementalCrawl(entries, output_dir) as run:    # entries: [(url, lastmod), ...]
+        for url in run.pending():                              # lastmod changed / new / retry
+            if await run.not_modified(url):                    # ETag revalidation, 304
+                continue
+            run.save(url, await crawler.arun(url=url, config=config))
+    print(run.counts)
+
+`run.stream(entries)` is the same as pending() for an async source such as
+sitemap.iter_sitemap(): URLs come out while the sitemap is still being read.
+
+Per URL, a SQLite file (crawl_state.sqlite) remembers the sitemap `lastmod`,
+the ETag the server sent, a SHA-256 of the page's markdown and where it was
+written. A page is crawled again only if its lastmod changed (or the sitemap
+has none) and the server does not answer a conditional GET with 304; its
+markdown file is replaced only if the hash changed. Files are written to a
+temporary name and renamed into place, so readers never see half a page.
+
+Runs are recorded too: if a run stops before finishing (crash, Ctrl+C), the
+next one resumes it and skips the URLs that run already handled.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+DEFAULT_STATE = 'crawl_state.sqlite'
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def output_path(url: str, output_dir: str) -> str:
+    """output/<host>/<path>.md; a path ending in "/" becomes <path>/index.md"""
+    parts = urlsplit(url)
+    path = parts.path.strip('/') or 'index'
+    if parts.path.endswith('/') and parts.path != '/':
+        path += '/index'
+    if path.endswith('.html'):
+        path = path[:-len('.html')]
+    if parts.query:
+        path += '_' + hashlib.sha1(parts.query.encode()).hexdigest()[:8]
+    # "host:port" is not a valid directory name on Windows
+    return os.path.join(output_dir, parts.netloc.replace(':', '_'), *path.split('/')) + '.md'
+
+def write_atomic(path: str, text: str):
+    """Write to a temp file in the same directory, fsync, then rename over `path`"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def response_etag(result: Any) -> Optional[str]:
+    """ETag header of a crawl4ai CrawlResult, if the server sent one"""
+    headers = {name.lower(): value for name, value in (getattr(result, 'response_headers', None) or {}).items()}
+    return headers.get('etag')
+
+class CrawlState:
+    """SQLite store of per-URL crawl state and of runs"""
+
+    def __init__(self, path: str = DEFAULT_STATE):
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # One transaction per URL: without this every commit waits for an fsync
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL NOT NULL, finished_at REAL);
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                lastmod TEXT,               -- from the sitemap when last crawled
+                etag TEXT,
+                content_hash TEXT,          -- sha256 of the markdown written
+                path TEXT,
+                status TEXT NOT NULL,       -- written, unchanged, not_modified, skipped, failed
+                error TEXT,
+                run_id INTEGER NOT NULL,    -- last run that handled the URL
+                crawled_at REAL,            -- last successful crawl
+                checked_at REAL NOT NULL);
+            -- URLs the sitemap being streamed has listed so far, with their lastmod
+            CREATE TABLE IF NOT EXISTS listed (url TEXT PRIMARY KEY, lastmod TEXT);
+        ''')
+
+    def begin_run(self) -> Tuple[int, bool]:
+        """(run id, resumed): reuses the newest run if it never finished"""
+        row = self._conn.execute('SELECT id, finished_at FROM runs ORDER BY id DESC LIMIT 1').fetchone()
+        if row is not None and row[1] is None:
+            return row[0], True
+        return self._conn.execute('INSERT INTO runs (started_at) VALUES (?)', (time.time(),)).lastrowid, False
+
+    def finish_run(self, run_id: int):
+        self._conn.execute('UPDATE runs SET finished_at = ? WHERE id = ?', (time.time(), run_id))
+
+    def get(self, url: str) -> Optional[dict]:
+        cursor = self._conn.execute('SELECT * FROM pages WHERE url = ?', (url,))
+        row = cursor.fetchone()
+        return dict(zip([column[0] for column in cursor.description], row)) if row else None
+
+    def record(self, url: str, run_id: int, status: str, **fields):
+        """Upsert the URL's row; fields not given keep their previous value"""
+        fields.update(status=status, run_id=run_id, checked_at=time.time())
+        if status == 'failed':
+            fields.setdefault('error', None)
+        else:
+            fields['error'] = None
+        columns = ', '.join(fields)
+        updates = ', '.join(f'{name} = excluded.{name}' for name in fields)
+        self._conn.execute(
+            f'INSERT INTO pages (url, {columns}) VALUES (?, {", ".join("?" * len(fields))}) '
+            f'ON CONFLICT (url) DO UPDATE SET {updates}', (url, *fields.values()))
+
+    def list_url(self, url: str, lastmod: Optional[str]) -> bool:
+        """Remember a listed URL's lastmod; False if it was already listed"""
+        return self._conn.execute('INSERT OR IGNORE INTO listed VALUES (?, ?)', (url, lastmod)).rowcount == 1
+
+    def listed_lastmod(self, url: str) -> Optional[str]:
+        row = self._conn.execute('SELECT lastmod FROM listed WHERE url = ?', (url,)).fetchone()
+        return row[0] if row else None
+
+    def clear_listed(self):
+        self._conn.execute('DELETE FROM listed')
+
+    def close(self):
+        self._conn.close()
+
+class IncrementalCrawl:
+    """One run over a sitemap's entries: decides what to crawl and stores the results"""
+
+    def __init__(self, entries: Iterable[Tuple[str, Optional[str]]] = (), output_dir: str = 'output',
+                 state_path: Optional[str] = None, timeout: float = 15.0):
+        self.lastmod = dict(entries)
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.state = CrawlState(state_path or os.path.join(output_dir, DEFAULT_STATE))
+        self.timeout = timeout
+        self.counts = Counter()
+        self.run_id: Optional[int] = None
+        self.resumed = False
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'IncrementalCrawl':
+        self.run_id, self.resumed = self.state.begin_run()
+        self.state.clear_listed()
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        # A run that raised (or was cancelled) stays open so the next one resumes it
+        if exc_type is None:
+            self.state.finish_run(self.run_id)
+        self.state.close()
+
+    def _wanted(self, url: str, lastmod: Optional[str]) -> bool:
+        """False (and counted) for URLs this resumed run handled or whose lastmod is unchanged"""
+        page = self.state.get(url)
+        # Failures are retried on resume
+        if self.resumed and page is not None and page['run_id'] == self.run_id and page['status'] != 'failed':
+            self.counts['resumed'] += 1
+            return False
+        if (page is not None and lastmod and page['lastmod'] == lastmod and page['crawled_at']
+                and page['path'] and os.path.exists(page['path'])):
+            self.state.record(url, self.run_id, 'skipped')
+            self.counts['skipped'] += 1
+            return False
+        return True
+
+    def pending(self) -> List[str]:
+        """URLs to look at this run; unchanged lastmods are recorded as skipped"""
+        return [url for url, lastmod in self.lastmod.items() if self._wanted(url, lastmod)]
+
+    async def stream(self, entries: AsyncIterable[Tuple[str, Optional[str]]]) -> AsyncIterator[str]:
+        """pending() for entries that arrive over time; a URL listed twice is yielded once.
+
+        Listed URLs are kept in the state file rather than in memory, so a
+        sitemap of millions of URLs costs no more RAM than a small one.
+        """
+        async for url, lastmod in entries:
+            if not self.state.list_url(url, lastmod):
+                continue
+            self.counts['listed'] += 1
+            if self._wanted(url, lastmod):
+                yield url
+
+    def listed_lastmod(self, url: str) -> Optional[str]:
+        if url in self.lastmod:
+            return self.lastmod[url]
+        return self.state.listed_lastmod(url)
+
+    async def not_modified(self, url: str) -> bool:
+        """True (and recorded) if the server answers our stored ETag with 304"""
+        page = self.state.get(url)
+        if page is None or not page['etag'] or not page['path'] or not os.path.exists(page['path']):
+            return False
+        try:
+            async with self._session.get(url, headers={'If-None-Match': page['etag']}) as response:
+                if response.status != 304:
+                    return False
+        except (aiohttp.ClientError, TimeoutError):
+            return False
+        self.state.record(url, self.run_id, 'not_modified', lastmod=self.listed_lastmod(url))
+        self.counts['not_modified'] += 1
+        return True
+
+    def save(self, url: str, result: Any) -> str:
+        """Store a crawl4ai CrawlResult: rewrite the markdown only if it changed"""
+        if not getattr(result, 'success', False):
+            error = getattr(result, 'error_message', None) or 'crawl failed'
+            self.state.record(url, self.run_id, 'failed', error=error)
+            self.counts['failed'] += 1
+            return 'failed'
+        return self.save_markdown(url, result.markdown.raw_markdown, response_etag(result))
+
+    def save_markdown(self, url: str, markdown: str, etag: Optional[str] = None) -> str:
+        digest = content_hash(markdown)
+        page = self.state.get(url)
+        path = output_path(url, self.output_dir)
+        status = 'unchanged'
+        if page is None or page['content_hash'] != digest or not os.path.exists(path):
+            write_atomic(path, markdown)
+            status = 'written'
+        self.state.record(url, self.run_id, status, lastmod=self.listed_lastmod(url), etag=etag,
+                          content_hash=digest, path=path, crawled_at=time.time())
+        self.counts[status] += 1
+        return status
+
+    def fail(self, url: str, error: str):
+        self.state.record(url, self.run_id, 'failed', error=error)
+        self.counts['failed'] += 1
@@ -1,9 +1,8 @@
 import os
 import sys
+import time
 import psutil
 import asyncio
-import requests
-from xml.etree import ElementTree
 
 __location__ = os.path.dirname(os.path.abspath(__file__))
 __output__ = os.path.join(__location__, "output")
@@ -13,10 +12,42 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
 
 
-from typing import List
+from typing import AsyncIterable, Optional, Tuple
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+from crawl4ai.content_scraping_strategy import ContentScrapingStrategy
+from crawl4ai.markdown_generation_strategy import MarkdownGenerationStrategy
+from crawl4ai.models import MarkdownGenerationResult, ScrapingResult
+from scheduler import CrawlScheduler
+from adaptive import ConcurrencyController, Crawl4AIProbe
+from crawl_state import IncrementalCrawl, response_etag
+from processing import PageProcessor
+from sitemap import SitemapCache, iter_sitemap
 
-async def crawl_parallel(urls: List[str], max_concurrent: int = 3):
+# Pydantic AI documentation
+SITEMAP_URL = "https://ai.pydantic.dev/sitemap.xml"
+
+# Returned by fetch when the server confirms the stored copy is current
+NOT_MODIFIED = "not modified"
+
+class RawHTMLOnly(ContentScrapingStrategy):
+    """Skips crawl4ai's HTML cleaning inside arun(); processing.py does it in a worker process"""
+    logger = None
+
+    def scrap(self, url: str, html: str, **kwargs) -> ScrapingResult:
+        return ScrapingResult(cleaned_html="", success=True)
+
+    async def ascrap(self, url: str, html: str, **kwargs) -> ScrapingResult:
+        return self.scrap(url, html, **kwargs)
+
+class NoMarkdown(MarkdownGenerationStrategy):
+    """Skips markdown generation inside arun(); processing.py does it in a worker process"""
+
+    def generate_markdown(self, input_html: str, base_url: str = "", **kwargs) -> MarkdownGenerationResult:
+        return MarkdownGenerationResult(raw_markdown="", markdown_with_citations="", references_markdown="")
+
+async def crawl_parallel(entries: AsyncIterable[Tuple[str, Optional[str]]], max_concurrent: int = 3, per_domain: Optional[int] = None, retries: int = 2,
+                         memory_limit_mb: float = 2048, latency_target: Optional[float] = None,
+                         processes: Optional[int] = None):
     print("\n=== Parallel Crawling with Browser Reuse + Memory Check ===")
 
     # We'll keep track of peak memory usage across all tasks
@@ -36,89 +67,112 @@ async def crawl_parallel(urls: List[str], max_concurrent: int = 3):
         verbose=False,   # corrected from 'verbos=False'
         extra_args=["--disable-gpu", "--disable-dev-shm-usage", "--no-sandbox"],
     )
-    crawl_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+    # The browser only fetches: cleaning, markdown and chunking are CPU work that would
+    # stall the event loop (and every other crawl), so they run in a process pool
+    crawl_config = CrawlerRunConfig(
+        cache_mode=CacheMode.BYPASS, scraping_strategy=RawHTMLOnly(), markdown_generator=NoMarkdown()
+    )
 
     # Create the crawler instance
     crawler = AsyncWebCrawler(config=browser_config)
     await crawler.start()
 
+    # Crawl state in output/crawl_state.sqlite: unchanged pages are skipped,
+    # an interrupted run is resumed, markdown goes to output/<host>/<path>.md
+    run = IncrementalCrawl(output_dir=__output__)
+
+    # ETags wait here while their page is in the pool
+    etags = {}
+
+    def processed(page):
+        run.save_markdown(page.url, page.markdown, etags.pop(page.url, None))
+
+    def processing_failed(url: str, error: str):
+        etags.pop(url, None)
+        print(f"Error processing {url}: {error}")
+        run.fail(url, error)
+
+    # Chunks for embedding go to output/chunks.jsonl (see processing.py)
+    processor = PageProcessor(os.path.join(__output__, "chunks.jsonl"), processes=processes,
+                              on_page=processed, on_error=processing_failed)
+
+    async def fetch(url: str):
+        # Revalidate with the stored ETag first; only changed pages reach the browser
+        if await run.not_modified(url):
+            return NOT_MODIFIED
+        # No session_id: each crawl opens its own page and closes it when done
+        return await crawler.arun(url=url, config=crawl_config)
+
+    # Sliding window: a slot is refilled as soon as any crawl finishes,
+    # failed pages are retried with backoff (see scheduler.py)
+    # Start at half the slots; the controller grows them up to max_concurrent while
+    # browser + Python RSS stays under memory_limit_mb, shrinks them when it does not,
+    # and recycles browser contexts that leak pages (see adaptive.py)
+    scheduler = CrawlScheduler(fetch, max_concurrent=max(1, max_concurrent // 2), per_domain=per_domain, retries=retries)
+    probe = Crawl4AIProbe(crawler)
+    controller = ConcurrencyController(
+        scheduler, max_concurrent=max_concurrent, memory_limit_mb=memory_limit_mb, latency_target=latency_target,
+        page_count=probe.page_count, recycle=probe.recycle,
+        log_path=os.path.join(__location__, "concurrency_log.csv"),
+    )
+
     try:
-        # We'll chunk the URLs in batches of 'max_concurrent'
         success_count = 0
         fail_count = 0
-        for i in range(0, len(urls), max_concurrent):
-            batch = urls[i : i + max_concurrent]
-            tasks = []
-
-            for j, url in enumerate(batch):
-                # Unique session_id per concurrent sub-task
-                session_id = f"parallel_session_{i + j}"
-                task = crawler.arun(url=url, config=crawl_config, session_id=session_id)
-                tasks.append(task)
-
-            # Check memory usage prior to launching tasks
-            log_memory(prefix=f"Before batch {i//max_concurrent + 1}: ")
-
-            # Gather results
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Check memory usage after tasks complete
-            log_memory(prefix=f"After batch {i//max_concurrent + 1}: ")
-
-            # Evaluate results
-            for url, result in zip(batch, results):
-                if isinstance(result, Exception):
-                    print(f"Error crawling {url}: {result}")
-                    fail_count += 1
-                elif result.success:
+        log_memory(prefix="Start: ")
+        # Leaving the block with an exception keeps the run open, so the next start resumes it
+        async with run, processor:
+            if run.resumed:
+                print("Resuming the previous run")
+            await controller.start()
+            fetch_started = time.perf_counter()
+            # The scheduler reads the sitemap as slots free up, so crawling starts with its first entries
+            async for outcome in scheduler.run(run.stream(entries)):
+                controller.observe(outcome)
+                if outcome.ok:
+                    if outcome.result is not NOT_MODIFIED:
+                        etags[outcome.url] = response_etag(outcome.result)
+                        # Waits while the pool is behind; no new crawls start meanwhile
+                        await processor.submit(outcome.url, html=outcome.result.html)
                     success_count += 1
                 else:
+                    print(f"Error crawling {outcome.url} after {outcome.attempts} attempts: {outcome.error}")
+                    run.fail(outcome.url, outcome.error)
                     fail_count += 1
 
+                done = success_count + fail_count
+                if done % max_concurrent == 0:
+                    log_memory(prefix=f"After {done} pages ({scheduler.in_flight} in flight, {scheduler.queued} queued, "
+                                      f"{processor.pending} processing): ")
+            fetch_seconds = time.perf_counter() - fetch_started
+
+        if not run.counts['listed']:
+            print("No URLs found to crawl")
         print(f"\nSummary:")
         print(f"  - Successfully crawled: {success_count}")
         print(f"  - Failed: {fail_count}")
+        print(f"  - Run {run.run_id}: {dict(run.counts)}")
+        fetched = success_count + fail_count
+        print(f"  - Fetching: {fetched} pages in {fetch_seconds:.1f}s ({fetched / max(fetch_seconds, 1e-9):.1f} pages/s)")
+        stats = processor.report()
+        print(f"  - Processing: {stats['pages']} pages in {stats['seconds']}s of pool time "
+              f"({stats['pages_per_second']} pages/s, {processor.processes} processes, {stats['cpu_seconds']}s CPU)")
+        print(f"  - Chunks: {stats['chunks']} written to {processor.output_path}, "
+              f"{stats['duplicate_chunks']} duplicates dropped")
+        print(f"  - Crawl waited {stats['blocked_seconds']}s for the pool (backpressure)")
 
     finally:
+        await controller.stop()
+        print(f"\nController decisions: {len(controller.history)} samples -> {controller.log_path}")
+        print(f"Peak browser + Python memory (MB): {controller.peak_rss_mb:.0f}")
         print("\nClosing crawler...")
         await crawler.close()
         # Final memory log
         log_memory(prefix="Final: ")
         print(f"\nPeak memory usage (MB): {peak_memory // (1024 * 1024)}")
 
-def get_pydantic_ai_docs_urls():
-    """
-    Fetches all URLs from the Pydantic AI documentation.
-    Uses the sitemap (https://ai.pydantic.dev/sitemap.xml) to get these URLs.
-
-    Returns:
-        List[str]: List of URLs
-    """
-    sitemap_url = "https://ai.pydantic.dev/sitemap.xml"
-    try:
-        response = requests.get(sitemap_url)
-        response.raise_for_status()
-
-        # Parse the XML
-        root = ElementTree.fromstring(response.content)
-
-        # Extract all URLs from the sitemap
-        # The namespace is usually defined in the root element
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        urls = [loc.text for loc in root.findall('.//ns:loc', namespace)]
-
-        return urls
-    except Exception as e:
-        print(f"Error fetching sitemap: {e}")
-        return []
-
 async def main():
-    urls = get_pydantic_ai_docs_urls()
-    if urls:
-        print(f"Found {len(urls)} URLs to crawl")
-        await crawl_parallel(urls, max_concurrent=10)
-    else:
-        print("No URLs found to crawl")
+    await crawl_parallel(iter_sitemap(SITEMAP_URL, cache=SitemapCache(os.path.join(__output__, "sitemaps"))), max_concurrent=10)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""Post-processing of crawled pages in a process pool, off the crawler's event loop.
+
+    async with PageProcessor("output/chunks.jsonl", processes=4) as processor:
+        async for outcome in scheduler.run(urls):
+            # Waits while `max_pending` pages are queued or being processed
+            await processor.submit(outcome.url, html=outcome.result.html)
+    print(processor.report())
+
+Each page is handed to a worker process, which
+1. cleans the raw HTML and converts it to markdown with crawl4ai's own
+   scraping and markdown strategies (skipped when markdown is submitted)
+2. splits the markdown along headings and paragraphs into chunks of at most
+   `chunk_chars` characters, keeping code blocks whole and recording each
+   chunk's heading path
+3. drops chunks that are too short or repeated within the page
+
+Back in the crawling process, each page's chunks replace its shard,
+output/chunks/<host>/<path>.jsonl (written atomically, like the markdown).
+When the run ends cleanly, every shard, including those of pages this run
+skipped as unchanged, is combined into one JSONL file, one chunk per line, ready
+for an embedding job. Chunks already written for another page (navigation,
+footers, shared snippets) are dropped by hash:
+
+    {"id": "https://ai.pydantic.dev/agents/#3", "url": "https://ai.pydantic.dev/agents/", "chunk": 3,
+     "heading": "Agents > Running Agents", "text": "...", "words": 182, "hash": "..."}
+
+A run that raises leaves the combined file as it was; the shards it wrote
+are picked up by the next clean run.
+
+`submit` waits while the pool is behind, so a crawl loop that awaits it stops
+pulling pages: the crawler never gets more than `max_pending` pages ahead.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from crawl_state import output_path as page_path, write_atomic
+
+DEFAULT_CHUNK_CHARS = 1500
+MIN_WORDS = 3
+
+HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE = re.compile(r'^\s*(```|~~~)')
+BLANK_LINES = re.compile(r'\n{3,}')
+
+class ProcessedPage(NamedTuple):
+    url: str
+    markdown: str
+    # [{'heading', 'text', 'words', 'hash'}, ...] in page order
+    chunks: List[dict]
+    # CPU time the worker spent on the page
+    cpu_seconds: float
+
+# Per worker process, created on first use
+_scraper = None
+_generator = None
+
+def html_to_markdown(html: str, url: str) -> str:
+    """crawl4ai's default pipeline: LXML cleaning, then DefaultMarkdownGenerator"""
+    global _scraper, _generator
+    if _generator is None:
+        from crawl4ai import DefaultMarkdownGenerator, LXMLWebScrapingStrategy
+        _scraper, _generator = LXMLWebScrapingStrategy(), DefaultMarkdownGenerator()
+    cleaned = _scraper.scrap(url, html).cleaned_html
+    return _generator.generate_markdown(input_html=cleaned, base_url=url).raw_markdown
+
+def clean_markdown(markdown: str) -> str:
+    lines = [line.rstrip() for line in markdown.replace('\r\n', '\n').split('\n')]
+    return BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+def split_blocks(markdown: str) -> List[str]:
+    """Paragraphs, headings, lists... separated by blank lines; fenced code stays in one block"""
+    blocks, current, in_code = [], [], False
+    for line in markdown.split('\n'):
+        if FENCE.match(line):
+            in_code = not in_code
+        if not line.strip() and not in_code:
+            if current:
+                blocks.append('\n'.join(current))
+                current = []
+            continue
+        # A heading is a block of its own even without blank lines around it
+        if not in_code and HEADING.match(line):
+            if current:
+                blocks.append('\n'.join(current))
+            blocks.append(line)
+            current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+def split_long(block: str, max_chars: int) -> List[str]:
+    """Pieces of a block longer than max_chars, cut at line ends (or inside very long lines)"""
+    pieces, current, size = [], [], 0
+    for line in block.split('\n'):
+        while len(line) > max_chars:
+            cut = line.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.extend(['\n'.join(current)] if current else [])
+            current, size = [], 0
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        if current and size + len(line) + 1 > max_chars:
+            pieces.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append('\n'.join(current))
+    return pieces
+
+def chunk_markdown(markdown: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[Tuple[str, str]]:
+    """(heading path, text) chunks; a heading always starts a new chunk"""
+    chunks: List[Tuple[str, str]] = []
+    headings: List[Tuple[int, str]] = []
+    current: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            chunks.append((' > '.join(title for _, title in headings), '\n\n'.join(current)))
+        current, size = [], 0
+
+    for block in split_blocks(markdown):
+        heading = HEADING.match(block)
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, heading.group(2)))
+        for piece in split_long(block, max_chars) if len(block) > max_chars else [block]:
+            if current and size + len(piece) + 2 > max_chars:
+                flush()
+            current.append(piece)
+            size += len(piece) + 2
+    flush()
+    return chunks
+
+def chunk_hash(text: str) -> str:
+    """Case- and whitespace-insensitive, so re-wrapped copies of a chunk match"""
+    return hashlib.sha256(' '.join(text.lower().split()).encode('utf-8')).hexdigest()
+
+def process_page(url: str, html: Optional[str], markdown: Optional[str],
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS, min_words: int = MIN_WORDS) -> ProcessedPage:
+    """Runs in a worker process: HTML -> markdown -> deduplicated chunks"""
+    start = time.process_time()
+    if markdown is None:
+        markdown = html_to_markdown(html or '', url)
+    markdown = clean_markdown(markdown)
+    chunks, seen = [], set()
+    for heading, text in chunk_markdown(markdown, chunk_chars):
+        words = len(text.split())
+        digest = chunk_hash(text)
+        if words < min_words or digest in seen:
+            continue
+        seen.add(digest)
+        chunks.append({'heading': heading, 'text': text, 'words': words, 'hash': digest})
+    return ProcessedPage(url, markdown, chunks, time.process_time() - start)
+
+def shard_path(url: str, shard_dir: str) -> str:
+    """<shard_dir>/<host>/<path>.jsonl, laid out like the markdown files"""
+    return page_path(url, shard_dir)[:-len('.md')] + '.jsonl'
+
+def iter_shards(shard_dir: str) -> Iterator[str]:
+    """Shard files in a stable (sorted) order"""
+    for directory, subdirs, files in os.walk(shard_dir):
+        subdirs.sort()
+        for name in sorted(files):
+            if name.endswith('.jsonl'):
+                yield os.path.join(directory, name)
+
+def print_error(url: str, error: str):
+    print(f"Error processing {url}: {error}")
+
+class PageProcessor:
+    """Pipeline stage between the crawler and the JSONL chunk file"""
+
+    def __init__(self, output_path: str, shard_dir: Optional[str] = None,
+                 processes: Optional[int] = None, max_pending: Optional[int] = None,
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS, min_words: int = MIN_WORDS,
+                 on_page: Optional[Callable[[ProcessedPage], None]] = None,
+                 on_error: Optional[Callable[[str, str], None]] = None):
+        self.output_path = output_path
+        self.shard_dir = shard_dir or os.path.join(os.path.dirname(os.path.abspath(output_path)), 'chunks')
+        self.processes = processes or os.cpu_count() or 1
+        # Enough to keep every worker busy while the next pages are pickled
+        self.max_pending = max_pending or 2 * self.processes
+        self.chunk_chars = chunk_chars
+        self.min_words = min_words
+        self.on_page = on_page
+        self.on_error = on_error or print_error
+        self.counts = Counter()
+        self.cpu_seconds = 0.0
+        # Wall time with at least one page in the pool, and time submit() spent waiting for room
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = set()
+        self._busy_since = 0.0
+
+    async def __aenter__(self) -> 'PageProcessor':
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        # Spawned, not forked: the crawling process already runs threads (Playwright driver, event loop)
+        self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'))
+        self._slots = asyncio.Semaphore(self.max_pending)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                await self.drain()
+            else:
+                for future in list(self._pending):
+                    future.cancel()
+        finally:
+            self._pool.shutdown(wait=exc_type is None, cancel_futures=True)
+        if exc_type is None:
+            await asyncio.to_thread(self.combine)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, url: str, html: Optional[str] = None, markdown: Optional[str] = None):
+        """Queue a page (raw HTML, or markdown to skip conversion); waits while the pool is full"""
+        waited = time.perf_counter()
+        await self._slots.acquire()
+        self.blocked_seconds += time.perf_counter() - waited
+        if not self._pending:
+            self._busy_since = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool, process_page, url, html, markdown, self.chunk_chars, self.min_words)
+        self._pending.add(future)
+        future.add_done_callback(partial(self._finished, url))
+
+    async def drain(self):
+        """Wait until every submitted page is processed and written"""
+        while self._pending:
+            await asyncio.wait(set(self._pending))
+
+    def _finished(self, url: str, future: asyncio.Future):
+        self._pending.discard(future)
+        self._slots.release()
+        if not self._pending:
+            self.busy_seconds += time.perf_counter() - self._busy_since
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.counts['failed'] += 1
+            self.on_error(url, repr(future.exception()))
+            return
+        page = future.result()
+        self.cpu_seconds += page.cpu_seconds
+        self._write(page)
+        if self.on_page is not None:
+            self.on_page(page)
+
+    def _write(self, page: ProcessedPage):
+        """Replace the page's shard; an empty page leaves an empty shard, dropping its old chunks"""
+        self.counts['pages'] += 1
+        lines = [json.dumps({'id': f'{page.url}#{index}', 'url': page.url, 'chunk': index, **chunk},
+                            ensure_ascii=False) + '\n'
+                 for index, chunk in enumerate(page.chunks)]
+        write_atomic(shard_path(page.url, self.shard_dir), ''.join(lines))
+
+    def combine(self):
+        """Rebuild output_path from every shard, dropping chunks already written for another page"""
+        seen = set()
+        self.counts['chunks'] = self.counts['duplicate_chunks'] = self.counts['words'] = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.output_path)),
+                                        prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                for path in iter_shards(self.shard_dir):
+                    with open(path, encoding='utf-8') as shard:
+                        for line in shard:
+                            record = json.loads(line)
+                            # Shared navigation, footers and snippets are embedded once
+                            if record['hash'] in seen:
+                                self.counts['duplicate_chunks'] += 1
+                                continue
+                            seen.add(record['hash'])
+                            out.write(line)
+                            self.counts['chunks'] += 1
+                            self.counts['words'] += record['words']
+                out.flush()
+                os.fsync(out.fileno())
+            # Readers of output_path only ever see a finished file
+            os.replace(tmp_path, self.output_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def report(self) -> dict:
+        pages = self.counts['pages'] + self.counts['failed']
+        return {
+            'pages': self.counts['pages'],
+            'failed': self.counts['failed'],
+            'chunks': self.counts['chunks'],
+            'duplicate_chunks': self.counts['duplicate_chunks'],
+            'words': self.counts['words'],
+            'seconds': round(self.busy_seconds, 3),
+            'pages_per_second': round(pages / self.busy_seconds, 1) if self.busy_seconds else None,
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+        }
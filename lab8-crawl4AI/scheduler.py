@@ -0,0 +1,227 @@
+"""Sliding-window crawl scheduler.
+
+    scheduler = CrawlScheduler(fetch, max_concurrent=10, per_domain=4, retries=2)
+    async for outcome in scheduler.run(urls):        # as each page finishes
+        print(outcome.url, outcome.ok, outcome.attempts)
+
+`fetch(url)` is any coroutine function, e.g. a wrapper around
+`crawler.arun(url=url, config=...)`. Unlike slicing URLs into batches and
+awaiting asyncio.gather on each, a slot is refilled the moment any crawl
+finishes, so one slow page holds one slot instead of stalling its batch.
+
+- priority: lower numbers start first (`add(url, priority=-1)`), FIFO within a priority
+- per-domain caps: at most `per_domain` (or `domain_limits[host]`) crawls
+  per host; jobs for a full host wait without blocking other hosts
+- retries: failures (exceptions, or results whose `.success` is false) are
+  re-queued after exponential backoff with jitter, up to `retries` times
+- resize(n) changes the number of slots while running (0 pauses new crawls)
+- `urls` may be a list or an async iterable, consumed as slots free up
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+from urllib.parse import urlsplit
+
+Fetch = Callable[[str], Awaitable[Any]]
+
+class CrawlOutcome(NamedTuple):
+    url: str
+    # Whatever fetch returned on the last attempt (None if it raised)
+    result: Any
+    error: Optional[str]
+    attempts: int
+    # Seconds from the first attempt to the final one
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def default_error(result: Any) -> Optional[str]:
+    """Error of a crawl4ai CrawlResult-like object, None when it succeeded"""
+    if getattr(result, 'success', True):
+        return None
+    return getattr(result, 'error_message', None) or 'crawl failed'
+
+class CrawlScheduler:
+    def __init__(self, fetch: Fetch, max_concurrent: int = 10, per_domain: Optional[int] = None,
+                 domain_limits: Optional[Dict[str, int]] = None, retries: int = 2, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, error_of: Callable[[Any], Optional[str]] = default_error):
+        self.fetch = fetch
+        self.max_concurrent = max_concurrent
+        self.per_domain = per_domain
+        self.domain_limits = domain_limits or {}
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.error_of = error_of
+        # Per domain, a heap of (priority, sequence, url, attempt, first_started)
+        self._queues: Dict[str, List[tuple]] = {}
+        self._queued = 0
+        # (priority, sequence, domain) of the head job of each domain with a free slot. A capped
+        # domain is left out until a crawl of it finishes, so starting a job costs O(log n)
+        self._ready: List[tuple] = []
+        self._ready_key: Dict[str, tuple] = {}
+        self._sequence = itertools.count()
+        self._active: Dict[str, int] = {}
+        self._backing_off = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._room: Optional[asyncio.Event] = None
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._active.values())
+
+    @property
+    def queued(self) -> int:
+        return self._queued + self._backing_off
+
+    def resize(self, max_concurrent: int):
+        """Change the number of slots; running crawls finish, new ones start up to the new limit"""
+        self.max_concurrent = max(0, max_concurrent)
+        if self._wake is not None:
+            self._wake.set()
+
+    def add(self, url: str, priority: int = 0):
+        self._push(priority, url, 1, None)
+
+    def _push(self, priority: int, url: str, attempt: int, first_started: Optional[float]):
+        domain = urlsplit(url).netloc
+        job = (priority, next(self._sequence), url, attempt, first_started)
+        heapq.heappush(self._queues.setdefault(domain, []), job)
+        self._queued += 1
+        self._mark_ready(domain)
+        if self._wake is not None:
+            self._wake.set()
+
+    def _limit(self, domain: str) -> Optional[int]:
+        return self.domain_limits.get(domain, self.per_domain)
+
+    def _mark_ready(self, domain: str):
+        """(Re-)list the domain's head job in the ready heap if the domain has a free slot"""
+        queue = self._queues.get(domain)
+        limit = self._limit(domain)
+        if not queue or (limit is not None and self._active.get(domain, 0) >= limit):
+            return
+        key = queue[0][:2]
+        if self._ready_key.get(domain) != key:
+            # A superseded entry for this domain stays in the heap and is skipped when popped
+            self._ready_key[domain] = key
+            heapq.heappush(self._ready, (*key, domain))
+
+    def _next_startable(self) -> Optional[tuple]:
+        """Pop the best job whose domain has a free slot, leaving the others queued"""
+        while self._ready:
+            priority, sequence, domain = heapq.heappop(self._ready)
+            if self._ready_key.get(domain) != (priority, sequence):
+                continue
+            del self._ready_key[domain]
+            queue = self._queues[domain]
+            job = heapq.heappop(queue)
+            if not queue:
+                del self._queues[domain]
+            self._queued -= 1
+            if self._room is not None:
+                self._room.set()
+            return job
+        return None
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    async def _attempt(self, job: tuple):
+        priority, _, url, attempt, first_started = job
+        first_started = first_started or time.perf_counter()
+        try:
+            result = await self.fetch(url)
+            error = self.error_of(result)
+        except Exception as exc:
+            result, error = None, repr(exc)
+        return job, first_started, result, error
+
+    def _retry_later(self, job: tuple, first_started: float):
+        priority, _, url, attempt, _ = job
+        self._backing_off += 1
+
+        def requeue():
+            self._backing_off -= 1
+            self._push(priority, url, attempt + 1, first_started)
+
+        asyncio.get_running_loop().call_later(self.backoff(attempt), requeue)
+
+    async def _feed(self, urls: AsyncIterable[str], high_water: int):
+        async for url in urls:
+            self.add(url)
+            # Backpressure: do not read a huge source far ahead of the crawl
+            while self._queued >= high_water:
+                self._room.clear()
+                await self._room.wait()
+
+    async def run(self, urls: Union[Iterable[str], AsyncIterable[str], None] = None):
+        """Crawl everything added (plus `urls`), yielding a CrawlOutcome per URL as it finishes"""
+        self._wake = asyncio.Event()
+        self._room = asyncio.Event()
+        feeder = None
+        if hasattr(urls, '__aiter__'):
+            feeder = asyncio.create_task(self._feed(urls, high_water=max(100, 4 * self.max_concurrent)))
+        else:
+            for url in urls or ():
+                self.add(url)
+
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while True:
+                while len(running) < self.max_concurrent:
+                    job = self._next_startable()
+                    if job is None:
+                        break
+                    domain = urlsplit(job[2]).netloc
+                    self._active[domain] = self._active.get(domain, 0) + 1
+                    self._mark_ready(domain)
+                    running[asyncio.create_task(self._attempt(job))] = domain
+
+                feeding = feeder is not None and not feeder.done()
+                if not running and not self._queued and not self._backing_off and not feeding:
+                    break
+
+                self._wake.clear()
+                waiter = asyncio.create_task(self._wake.wait())
+                waiting_on = set(running) | {waiter} | ({feeder} if feeding else set())
+                done, _ = await asyncio.wait(waiting_on, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+
+                for task in done:
+                    if task not in running:
+                        continue
+                    domain = running.pop(task)
+                    self._active[domain] -= 1
+                    self._mark_ready(domain)
+                    job, first_started, result, error = task.result()
+                    attempt = job[3]
+                    if error is not None and attempt <= self.retries:
+                        self._retry_later(job, first_started)
+                        continue
+                    yield CrawlOutcome(job[2], result, error, attempt, time.perf_counter() - first_started)
+                if feeder is not None and feeder.done() and feeder.exception() is not None:
+                    raise feeder.exception()
+        finally:
+            for task in running:
+                task.cancel()
+            if feeder is not None:
+                feeder.cancel()
+            self._wake = self._room = None
+
+async def crawl_batched(fetch: Fetch, urls: List[str], max_concurrent: int = 10,
+                        error_of: Callable[[Any], Optional[str]] = default_error):
+    """The fixed-batch approach (asyncio.gather per slice of max_concurrent), kept for comparison"""
+    for i in range(0, len(urls), max_concurrent):
+        batch = urls[i:i + max_concurrent]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(fetch(url) for url in batch), return_exceptions=True)
+        for url, result in zip(batch, results):
+            error = repr(result) if isinstance(result, Exception) else error_of(result)
+            yield CrawlOutcome(url, None if isinstance(result, Exception) else result, error, 1,
+                               time.perf_counter() - start)
@@ -1,11 +1,18 @@
 import asyncio
-from typing import List
+import os
+from typing import AsyncIterable, Optional, Tuple
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
-import requests
-from xml.etree import ElementTree
+from crawl_state import IncrementalCrawl
+from sitemap import SitemapCache, iter_sitemap
 
-async def crawl_sequential(urls: List[str]):
+__location__ = os.path.dirname(os.path.abspath(__file__))
+__output__ = os.path.join(__location__, "output")
+
+# Pydantic AI documentation
+SITEMAP_URL = "https://ai.pydantic.dev/sitemap.xml"
+
+async def crawl_sequential(entries: AsyncIterable[Tuple[str, Optional[str]]]):
     print("\n=== Sequential Crawling with Session Reuse ===")
 
     browser_config = BrowserConfig(
@@ -24,55 +31,37 @@ async def crawl_sequential(urls: List[str]):
 
     try:
         session_id = "session1"  # Reuse the same session across all URLs
-        for url in urls:
-            result = await crawler.arun(
-                url=url,
-                config=crawl_config,
-                session_id=session_id
-            )
-            if result.success:
-                print(f"Successfully crawled: {url}")
-                # E.g. check markdown length
-                print(f"Markdown length: {len(result.markdown.raw_markdown)}")
-            else:
-                print(f"Failed: {url} - Error: {result.error_message}")
+        # Crawl state in output/crawl_state.sqlite: unchanged pages are skipped,
+        # an interrupted run is resumed, markdown goes to output/<host>/<path>.md
+        async with IncrementalCrawl(output_dir=__output__) as run:
+            if run.resumed:
+                print("Resuming the previous run")
+            # Crawling starts with the first sitemap entries, while the rest is still downloading
+            async for url in run.stream(entries):
+                if await run.not_modified(url):
+                    print(f"Not modified: {url}")
+                    continue
+                result = await crawler.arun(
+                    url=url,
+                    config=crawl_config,
+                    session_id=session_id
+                )
+                status = run.save(url, result)
+                if result.success:
+                    print(f"Successfully crawled: {url} ({status})")
+                    # E.g. check markdown length
+                    print(f"Markdown length: {len(result.markdown.raw_markdown)}")
+                else:
+                    print(f"Failed: {url} - Error: {result.error_message}")
+            if not run.counts['listed']:
+                print("No URLs found to crawl")
+            print(f"Run {run.run_id}: {dict(run.counts)}")
     finally:
         # After all URLs are done, close the crawler (and the browser)
         await crawler.close()
 
-def get_pydantic_ai_docs_urls():
-    """
-    Fetches all URLs from the Pydantic AI documentation.
-    Uses the sitemap (https://ai.pydantic.dev/sitemap.xml) to get these URLs.
-
-    Returns:
-        List[str]: List of URLs
-    """
-    sitemap_url = "https://ai.pydantic.dev/sitemap.xml"
-    try:
-        response = requests.get(sitemap_url)
-        response.raise_for_status()
-
-        # Parse the XML
-        root = ElementTree.fromstring(response.content)
-
-        # Extract all URLs from the sitemap
-        # The namespace is usually defined in the root element
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        urls = [loc.text for loc in root.findall('.//ns:loc', namespace)]
-
-        return urls
-    except Exception as e:
-        print(f"Error fetching sitemap: {e}")
-        return []
-
 async def main():
-    urls = get_pydantic_ai_docs_urls()
-    if urls:
-        print(f"Found {len(urls)} URLs to crawl")
-        await crawl_sequential(urls)
-    else:
-        print("No URLs found to crawl")
+    await crawl_sequential(iter_sitemap(SITEMAP_URL, cache=SitemapCache(os.path.join(__output__, "sitemaps"))))
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""Streaming sitemap reader shared by the crawlers.
+
+    async for entry in iter_sitemap("https://ai.pydantic.dev/sitemap.xml"):
+        print(entry.url, entry.lastmod)
+
+- parses while downloading: chunks are fed to an incremental XML parser
+  (XMLPullParser, the push-style twin of iterparse) and every finished
+  <url> is cleared from the tree, so memory stays flat for millions of URLs
+- follows <sitemapindex> files, fetching up to `concurrency` child
+  sitemaps at once (each sitemap is fetched once, `max_depth` levels deep)
+- reads gzip-compressed sitemaps (.xml.gz), detected by their magic bytes
+- yields entries as soon as they are parsed, through a queue bounded to
+  `buffer` parsed chunks: the crawler can start before the sitemap is
+  complete, and parsing waits when the crawler falls behind
+- with a SitemapCache, revalidates sitemaps with If-None-Match /
+  If-Modified-Since: a 304 is parsed from the copy kept on disk instead of
+  being downloaded again
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import AsyncIterator, Callable, Iterator, NamedTuple, Optional
+from xml.etree.ElementTree import XMLPullParser
+
+import aiohttp
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[str]
+
+def local_name(tag: str) -> Optional[str]:
+    """Tag name in the sitemap namespace (or none); None for extensions such as <image:loc>"""
+    if tag.startswith('{'):
+        return tag[len(SITEMAP_NS):] if tag.startswith(SITEMAP_NS) else None
+    return tag
+
+class SitemapParser:
+    """Incremental parser for one sitemap or sitemap index; feed() bytes, get entries back"""
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._root = None
+        self._inflate = None
+        self._first = True
+        # Text of the current <url>/<sitemap>, which may span several chunks
+        self._loc = self._lastmod = None
+
+    def feed(self, data: bytes):
+        """([page entries], [child sitemap URLs]) completed by this chunk"""
+        if self._first and data:
+            self._first = False
+            if data.startswith(GZIP_MAGIC):
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._inflate is not None:
+            data = self._inflate.decompress(data)
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self):
+        if self._inflate is not None:
+            self._parser.feed(self._inflate.flush())
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self):
+        pages, children = [], []
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                continue
+            # Namespaced in practice, but some generators omit the namespace
+            name = local_name(elem.tag)
+            if name == 'loc':
+                self._loc = elem.text.strip() if elem.text else None
+            elif name == 'lastmod':
+                self._lastmod = elem.text.strip() if elem.text else None
+            elif name in ('url', 'sitemap'):
+                if self._loc:
+                    if name == 'url':
+                        pages.append(SitemapEntry(self._loc, self._lastmod))
+                    else:
+                        children.append(self._loc)
+                self._loc = self._lastmod = None
+                # Drop the finished element (and the emptied ones before it) from the tree
+                self._root.clear()
+        return pages, children
+
+class SitemapCache:
+    """Sitemap bodies on disk with the ETag / Last-Modified they came with.
+
+    lab2's CachedSession keeps whole bodies in SQLite; here the body is teed to
+    a file while it is parsed and read back chunk by chunk, so a 50 MB sitemap
+    is never held in memory either way.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.counts = Counter()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def validators(self, url: str) -> dict:
+        """Conditional request headers for a stored sitemap ({} if none is stored)"""
+        path = self._path(url)
+        try:
+            with open(path + '.json', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not os.path.exists(path + '.body'):
+            return {}
+        headers = {}
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+        return headers
+
+    def read(self, url: str) -> Iterator[bytes]:
+        self.counts['revalidated'] += 1
+        with open(self._path(url) + '.body', 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    @contextmanager
+    def store(self, url: str, headers):
+        """File to write the body to, renamed into place if the block completes; None if not revalidatable"""
+        self.counts['downloaded'] += 1
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if not (etag or last_modified) or 'no-store' in headers.get('Cache-Control', ''):
+            yield None
+            return
+        path = self._path(url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                yield f
+            os.replace(tmp_path, path + '.body')
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        # Validators go last: a crash in between leaves old validators, which the server answers with 200
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'etag': etag, 'last_modified': last_modified}, f)
+
+def print_error(sitemap_url: str, exc: Exception):
+    print(f"Error fetching sitemap {sitemap_url}: {exc!r}")
+
+async def iter_sitemap(url: str, session: Optional[aiohttp.ClientSession] = None, concurrency: int = 4,
+                       max_depth: int = 3, buffer: int = 16, timeout: float = 30.0,
+                       on_error: Optional[Callable[[str, Exception], None]] = None,
+                       cache: Optional[SitemapCache] = None) -> AsyncIterator[SitemapEntry]:
+    """Every page URL reachable from `url` (a sitemap or sitemap index), in parse order"""
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=timeout))
+    on_error = on_error or print_error
+
+    entries: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+    slots = asyncio.Semaphore(concurrency)
+    seen = set()
+    tasks = set()
+    done = object()
+
+    async def read(sitemap_url: str, depth: int):
+        try:
+            async with slots:
+                parser = SitemapParser()
+                validators = cache.validators(sitemap_url) if cache is not None else {}
+                async with session.get(sitemap_url, headers=validators) as response:
+                    if response.status != 304 or not validators:
+                        response.raise_for_status()
+                        stored = cache.store(sitemap_url, response.headers) if cache is not None else nullcontext()
+                        with stored as body:
+                            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                                if body is not None:
+                                    body.write(chunk)
+                                await publish(parser.feed(chunk), depth)
+                            # Only a sitemap that parsed to the end is kept
+                            await publish(parser.close(), depth)
+                        return
+                for chunk in cache.read(sitemap_url):
+                    await publish(parser.feed(chunk), depth)
+                await publish(parser.close(), depth)
+        except Exception as exc:
+            on_error(sitemap_url, exc)
+
+    async def publish(parsed, depth: int):
+        pages, children = parsed
+        for child in children:
+            spawn(child, depth + 1)
+        # One queue item per chunk: a handoff per URL costs more than parsing it
+        if pages:
+            await entries.put(pages)
+
+    def spawn(sitemap_url: str, depth: int):
+        if sitemap_url in seen or depth > max_depth:
+            return
+        seen.add(sitemap_url)
+        task = asyncio.create_task(read(sitemap_url, depth))
+        tasks.add(task)
+        task.add_done_callback(finished)
+
+    def finished(task: asyncio.Task):
+        tasks.discard(task)
+        if not tasks:
+            entries.put_nowait(done) if not entries.full() else asyncio.create_task(entries.put(done))
+
+    try:
+        spawn(url, 0)
+        while True:
+            pages = await entries.get()
+            if pages is done:
+                if not tasks:
+                    break
+                continue
+            for entry in pages:
+                yield entry
+    finally:
+        for task in list(tasks):
+            task.cancel()
+        if own_session:
+            await session.close()
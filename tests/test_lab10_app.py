@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.apps import load_app
+
+@pytest.fixture
+def table_app_without_model():
+    env = {'MODEL_BACKEND': 'table', 'MODEL_PATH': '/nonexistent/music_recommender.joblib'}
+    with load_app('lab10-machine-learning', 'app', env) as module:
+        yield module
+
+def test_out_of_domain_input_without_fallback_model_is_422(table_app_without_model):
+    client = TestClient(table_app_without_model.app)
+    assert client.post('/predict', json={'age': 25, 'gender': 1}).status_code == 200
+    response = client.post('/predict', json={'age': 500, 'gender': 1})
+    assert response.status_code == 422
+    response = client.post('/predict/batch', json={'age': [25, 500], 'gender': [1, 1]})
+    assert response.status_code == 422
+
+def test_table_mode_cache_follows_the_fallback_model(tmp_path):
+    import os
+    import shutil
+
+    import joblib
+    import numpy as np
+    from sklearn.tree import DecisionTreeClassifier
+
+    from benchmarks.apps import REPO_ROOT
+
+    model_path = tmp_path / 'music_recommender.joblib'
+    shutil.copy(os.path.join(REPO_ROOT, 'lab10-machine-learning', 'music_recommender.joblib'), model_path)
+    # A table compiled for ages 0-60 leaves 61-120 to the cached joblib fallback
+    with load_app('lab10-machine-learning', 'lookup_table') as lookup_table:
+        np.savez(tmp_path / 'table.npz', **lookup_table.compile_table(joblib.load(model_path), age_range=(0, 60)))
+    env = {'MODEL_BACKEND': 'table', 'MODEL_PATH': str(model_path), 'MODEL_TABLE_PATH': str(tmp_path / 'table.npz'),
+           'MODEL_RELOAD_INTERVAL': '0', 'PREDICTION_CACHE': 'lru'}
+    with load_app('lab10-machine-learning', 'app', env) as module:
+        client = TestClient(module.app)
+        before = client.post('/predict', json={'age': 90, 'gender': 1}).json()['genre']
+        assert client.post('/predict', json={'age': 90, 'gender': 1}).json()['genre'] == before
+        assert client.get('/metrics/cache').json()['hits'] == 1
+
+        # Publish a new fallback model the way the registry expects: write, then rename into place
+        swapped = DecisionTreeClassifier().fit([[0, 0], [500, 1]], ['Swapped', 'Swapped'])
+        joblib.dump(swapped, tmp_path / 'new.joblib')
+        os.replace(tmp_path / 'new.joblib', model_path)
+
+        assert client.post('/predict', json={'age': 90, 'gender': 1}).json()['genre'] == 'Swapped'
+        assert client.get('/metrics/cache').json()['invalidations'] >= 1
+
+@pytest.fixture
+def sqlite_cache_app(tmp_path):
+    env = {'PREDICTION_CACHE': 'sqlite', 'PREDICTION_CACHE_PATH': str(tmp_path / 'cache.sqlite')}
+    with load_app('lab10-machine-learning', 'app', env) as module:
+        yield module
+
+def test_inputs_outside_the_domain_are_not_cached(sqlite_cache_app):
+    client = TestClient(sqlite_cache_app.app)
+    for age in (500, 10_000, -3):
+        assert client.post('/predict', json={'age': age, 'gender': 1}).status_code == 200
+    assert client.post('/predict', json={'age': 30, 'gender': 7}).status_code == 200
+    assert sqlite_cache_app.prediction_cache.backend.count() == 0
+    assert client.post('/predict', json={'age': 30, 'gender': 1}).status_code == 200
+    assert sqlite_cache_app.prediction_cache.backend.count() == 1
+
+def test_locked_cache_file_does_not_fail_the_request(sqlite_cache_app):
+    import sqlite3
+
+    client = TestClient(sqlite_cache_app.app)
+    blocker = sqlite3.connect(sqlite_cache_app.prediction_cache.backend.path, isolation_level=None)
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        response = client.post('/predict', json={'age': 30, 'gender': 1})
+    finally:
+        blocker.execute('ROLLBACK')
+        blocker.close()
+    assert response.status_code == 200 and response.json()['genre']
+    assert client.get('/metrics/cache').json()['errors'] >= 1
+
+def test_sqlite_backend_stays_bounded(tmp_path):
+    with load_app('lab10-machine-learning', 'prediction_cache') as prediction_cache:
+        backend = prediction_cache.SQLiteBackend(str(tmp_path / 'cache.sqlite'), maxsize=10, prune_every=5)
+        for i in range(100):
+            backend.set(f'v:{i}:0', 'Jazz')
+        assert backend.count() <= 10
+        assert backend.get('v:99:0') == 'Jazz' and backend.get('v:0:0') is None
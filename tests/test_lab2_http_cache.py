@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.apps import load_app
+
+@pytest.fixture
+def lab2(tmp_path):
+    with load_app('lab2-requests', 'stub_server') as stub, load_app('lab2-requests', 'http_cache') as http_cache:
+        with stub.stub_server() as server:
+            yield http_cache, server, str(tmp_path / 'http-cache.sqlite')
+
+def test_requests_with_credentials_bypass_the_cache(lab2):
+    http_cache, server, path = lab2
+    url = f'{server.url}/cache/300'
+    with http_cache.CachedSession(http_cache.HTTPCache(path)) as session:
+        assert session.get(url).from_cache == 'miss'
+        assert session.get(url).from_cache == 'hit'
+        response = session.get(url, headers={'Authorization': 'Bearer alice'})
+        assert not hasattr(response, 'from_cache')
+        session.cookies.set('session', 'bob')
+        assert not hasattr(session.get(url), 'from_cache')
+
+def test_entry_is_only_reused_for_matching_vary_headers(lab2):
+    http_cache, server, path = lab2
+    url = f'{server.url}/cache/300?vary=Accept-Language'
+    with http_cache.CachedSession(http_cache.HTTPCache(path)) as session:
+        english = session.get(url, headers={'Accept-Language': 'en'})
+        assert english.from_cache == 'miss' and b'<p>en</p>' in english.content
+        assert session.get(url, headers={'Accept-Language': 'en'}).from_cache == 'hit'
+        german = session.get(url, headers={'Accept-Language': 'de'})
+        assert german.from_cache == 'miss' and b'<p>de</p>' in german.content
+
+def test_cache_files_without_the_vary_column_are_upgraded(lab2):
+    http_cache, server, path = lab2
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE responses (url TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, '
+                 'body BLOB NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)')
+    conn.close()
+    with http_cache.CachedSession(http_cache.HTTPCache(path)) as session:
+        assert session.get(f'{server.url}/cache/300').from_cache == 'miss'
+        assert session.get(f'{server.url}/cache/300').from_cache == 'hit'
@@ -0,0 +1,25 @@
+import hashlib
+import os
+
+import pytest
+import requests
+
+from benchmarks.apps import load_app
+
+@pytest.fixture
+def lab2():
+    with load_app('lab2-requests', 'stub_server') as stub, load_app('lab2-requests', 'streaming') as streaming:
+        with stub.stub_server() as server:
+            yield stub, streaming, server
+
+def test_resume_keeps_bytes_received_before_a_mid_chunk_drop(lab2, tmp_path):
+    stub, streaming, server = lab2
+    size = 8 * 1024 * 1024 + 12345
+    # Drops fall inside read chunks, not on their boundaries
+    result = streaming.download_file(
+        f'{server.url}/bytes/{size}?fail_after=1000000', str(tmp_path / 'export.bin'), requests.Session(),
+        sha256=hashlib.sha256(stub.stub_bytes(0, size)).hexdigest(), max_resumes=10)
+    assert result.size == size
+    assert result.requests == -(-size // 1000000)
+    assert os.path.getsize(tmp_path / 'export.bin') == size
+    assert not os.path.exists(tmp_path / 'export.bin.part')
@@ -0,0 +1,82 @@
+import sys
+import threading
+
+import pytest
+
+from benchmarks.apps import load_app
+
+@pytest.fixture
+def store():
+    with load_app('lab3-fastapi', 'item_store') as module:
+        yield module.ItemStore()
+
+def test_get_in_the_middle_of_add_sees_nothing_or_the_finished_item(store):
+    adding, seen = None, []
+
+    class ReadingBytearray(bytearray):
+        """is_done bits that let a reader in whenever add() touches them"""
+
+        def append(self, value):
+            super().append(value)
+            seen.append(store.get(adding))
+
+        def __setitem__(self, index, value):
+            super().__setitem__(index, value)
+            seen.append(store.get(adding))
+
+    store._done = ReadingBytearray()
+    for adding in range(2_000):
+        assert store.add(f'item {adding}', is_done=True) == adding
+        assert store.get(adding) == (f'item {adding}', True)
+    assert len(seen) > 2_000 and all(item is None for item in seen)
+
+def test_readers_never_see_an_item_before_its_is_done_bit(store):
+    items = 5_000
+    wrong = []
+
+    def read():
+        for item_id in range(items):
+            try:
+                while (item := store.get(item_id)) is None:
+                    pass
+            except IndexError:
+                wrong.append(item_id)
+                continue
+            if item[1] is not True:
+                wrong.append(item_id)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        for i in range(items):
+            store.add(f'item {i}', is_done=True)
+        for reader in readers:
+            reader.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert wrong == []
+
+class CountingList(list):
+    """The store's text column, counting the slots a page reads"""
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return super().__getitem__(index)
+
+def test_pages_skip_deleted_items(store):
+    ids = [store.add(f'item {i}', is_done=i % 2 == 0) for i in range(20_000)]
+    for item_id in ids[:-10]:
+        store.delete(item_id)
+    store._texts = CountingList(store._texts)
+
+    page = store.list(limit=5)
+    # Deleted ids are compacted out of the index, so a page does not walk past them
+    assert store._texts.reads <= 2 * 10 + 2 * len(page)
+    assert [item_id for item_id, _, _ in page] == ids[-10:-5]
+    assert [done for _, _, done in page] == [i % 2 == 0 for i in range(len(ids) - 10, len(ids) - 5)]
+    assert [item_id for item_id, _, _ in store.list(after=page[-1][0], limit=10)] == ids[-5:]
+    assert [item_id for item_id, _, _ in store.list(is_done=True, limit=10)] == [i for i in ids[-10:] if i % 2 == 0]
@@ -0,0 +1,28 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.apps import lab5_database, load_app
+
+@pytest.fixture
+def client():
+    with lab5_database({}) as env, load_app('lab5-fastapi-postgresql', 'main', env) as module:
+        with TestClient(module.app) as client:
+            for text in ('What is Python?', 'What is FastAPI?'):
+                client.post('/questions/', json={
+                    'question_text': text, 'choices': [{'choice_text': 'Yes', 'is_correct': True}]})
+            yield client
+
+def test_search_matches_terms(client):
+    response = client.get('/questions/', params={'q': 'python'})
+    assert response.status_code == 200
+    assert [question['question_text'] for question in response.json()] == ['What is Python?']
+
+@pytest.mark.parametrize('q', [' ', '   \t'])
+def test_blank_query_does_not_filter(client, q):
+    response = client.get('/questions/', params={'q': q})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+@pytest.mark.parametrize('q', ['?', '!!! ...', '"', '_'])
+def test_punctuation_only_query_is_422(client, q):
+    assert client.get('/questions/', params={'q': q}).status_code == 422
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from benchmarks.apps import load_app
+
+PAGE = """# {title}
+
+{title} explains how the library handles {title} in detail.
+
+## Usage
+
+Call the {title} helper with the settings you need for it.
+
+## About
+
+Footer shared by every page of the documentation site.
+"""
+
+@pytest.fixture
+def processing():
+    with load_app('lab8-crawl4AI', 'processing') as module:
+        yield module
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+async def process(processing, output, pages, fail=False):
+    async with processing.PageProcessor(output, processes=1) as processor:
+        for url, title in pages.items():
+            await processor.submit(url, markdown=PAGE.format(title=title))
+        if fail:
+            await processor.drain()
+            raise RuntimeError('crawl crashed')
+    return processor
+
+def test_incremental_run_keeps_unchanged_pages(processing, tmp_path):
+    output = str(tmp_path / 'chunks.jsonl')
+    pages = {f'https://docs.example/{name}': name for name in ('agents', 'tools', 'models')}
+    asyncio.run(process(processing, output, pages))
+    first = read_records(output)
+    assert {record['url'] for record in first} == set(pages)
+
+    # Only one page changed: the others keep their chunks
+    processor = asyncio.run(process(processing, output, {'https://docs.example/tools': 'toolsets'}))
+    second = read_records(output)
+    assert {record['url'] for record in second} == set(pages)
+    assert any('toolsets' in record['text'] for record in second)
+    assert not any('tools ' in record['text'] for record in second if record['url'].endswith('/tools'))
+    assert processor.report()['pages'] == 1
+    # The shared footer is written once
+    assert sum('Footer shared' in record['text'] for record in second) == 1
+
+def test_crashed_run_leaves_previous_output(processing, tmp_path):
+    output = str(tmp_path / 'chunks.jsonl')
+    asyncio.run(process(processing, output, {'https://docs.example/agents': 'agents'}))
+    before = open(output, encoding='utf-8').read()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(process(processing, output, {'https://docs.example/tools': 'tools'}, fail=True))
+    assert open(output, encoding='utf-8').read() == before
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    # The page handled before the crash is in the next clean run's output
+    asyncio.run(process(processing, output, {}))
+    assert {record['url'] for record in read_records(output)} == {
+        'https://docs.example/agents', 'https://docs.example/tools'}
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from benchmarks.apps import load_app
+
+@pytest.fixture
+def scheduler_module():
+    with load_app('lab8-crawl4AI', 'scheduler') as module:
+        yield module
+
+class Recorder:
+    """fetch() that records start order and the peak number of crawls per host"""
+
+    def __init__(self):
+        self.started = []
+        self.active = {}
+        self.peak = {}
+
+    async def fetch(self, url):
+        host = url.split('/')[2]
+        self.started.append(url)
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        await asyncio.sleep(0)
+        self.active[host] -= 1
+
+async def crawl(scheduler):
+    return [outcome async for outcome in scheduler.run()]
+
+def test_per_domain_cap_on_a_large_single_site(scheduler_module):
+    recorder = Recorder()
+    scheduler = scheduler_module.CrawlScheduler(recorder.fetch, max_concurrent=10, per_domain=2, retries=0)
+    urls = [f'https://docs.example.com/{i}' for i in range(20_000)]
+    for url in urls:
+        scheduler.add(url)
+    outcomes = asyncio.run(crawl(scheduler))
+    assert len(outcomes) == len(urls) and all(outcome.ok for outcome in outcomes)
+    assert recorder.started == urls
+    assert recorder.peak == {'docs.example.com': 2}
+    assert scheduler.queued == 0 and scheduler.in_flight == 0
+
+def test_capped_host_does_not_block_others_and_priority_wins(scheduler_module):
+    recorder = Recorder()
+    scheduler = scheduler_module.CrawlScheduler(recorder.fetch, max_concurrent=4, per_domain=1,
+                                                domain_limits={'big.example.com': 2}, retries=0)
+    for i in range(1000):
+        scheduler.add(f'https://big.example.com/{i}')
+    scheduler.add('https://small.example.com/late')
+    scheduler.add('https://big.example.com/urgent', priority=-1)
+    asyncio.run(crawl(scheduler))
+    assert recorder.started[:3] == ['https://big.example.com/urgent', 'https://big.example.com/0',
+                                    'https://small.example.com/late']
+    assert recorder.started[3:] == [f'https://big.example.com/{i}' for i in range(1, 1000)]
+    assert recorder.peak == {'big.example.com': 2, 'small.example.com': 1}
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from benchmarks.apps import load_app
+
+SITEMAP = ('<?xml version="1.0" encoding="UTF-8"?>'
+           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+           + ''.join(f'<url><loc>https://example.com/{i}</loc><lastmod>2024-01-0{i}</lastmod></url>'
+                     for i in range(1, 4))
+           + '<url><loc>https://example.com/1</loc><lastmod>2024-01-01</lastmod></url>'
+           '</urlset>').encode()
+
+@pytest.fixture
+def lab8():
+    with load_app('lab8-crawl4AI', 'sitemap') as sitemap:
+        import crawl_state
+        yield sitemap, crawl_state
+
+async def serve(statuses):
+    async def handler(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            statuses.append(304)
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        statuses.append(200)
+        return web.Response(body=SITEMAP, content_type='application/xml', headers={'ETag': '"v1"'})
+    app = web.Application()
+    app.router.add_get('/sitemap.xml', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}/sitemap.xml'
+
+async def collect(sitemap, url, cache):
+    return [entry async for entry in sitemap.iter_sitemap(url, cache=cache)]
+
+def test_unchanged_sitemap_is_revalidated_and_read_from_disk(lab8, tmp_path):
+    sitemap, _ = lab8
+
+    async def main():
+        statuses = []
+        runner, url = await serve(statuses)
+        try:
+            cache = sitemap.SitemapCache(str(tmp_path / 'sitemaps'))
+            first = await collect(sitemap, url, cache)
+            second = await collect(sitemap, url, cache)
+        finally:
+            await runner.cleanup()
+        return statuses, first, second, cache.counts
+
+    statuses, first, second, counts = asyncio.run(main())
+    assert statuses == [200, 304]
+    assert len(first) == 4 and second == first
+    assert counts == {'downloaded': 1, 'revalidated': 1}
+
+def test_stream_dedupes_and_records_lastmod_from_the_state_file(lab8, tmp_path):
+    sitemap, crawl_state = lab8
+
+    async def main():
+        statuses = []
+        runner, url = await serve(statuses)
+        try:
+            async with crawl_state.IncrementalCrawl(output_dir=str(tmp_path)) as run:
+                urls = [page async for page in run.stream(sitemap.iter_sitemap(url))]
+                for page in urls:
+                    run.save_markdown(page, f'# {page}')
+        finally:
+            await runner.cleanup()
+        return run, urls
+
+    run, urls = asyncio.run(main())
+    assert urls == [f'https://example.com/{i}' for i in range(1, 4)]
+    assert run.lastmod == {}
+    state = crawl_state.CrawlState(str(tmp_path / crawl_state.DEFAULT_STATE))
+    try:
+        assert state.get('https://example.com/2')['lastmod'] == '2024-01-02'
+    finally:
+        state.close()